@@ -18,19 +18,36 @@
 
 import sublime
 import sublime_plugin
+import array
+import bisect
+import collections
+import concurrent.futures
+import difflib
+import hashlib
+import json
 import os
+import pathlib
+import queue
 import re
+import shutil
+import sqlite3
 import subprocess
+import threading
+import time
 
 
 class ScopeNameCommand(sublime_plugin.TextCommand):
-    def run(self, args):
+    resumes = {}  # number of latest scan continuation by view id
+
+    def run(self, args, resume=None):
         '''
-        Called when the scope_name command is run
+        Called when the scope_name command is run, resume continues scanning a large file
         '''
-        # get settings
-        settings.reload()
-        windows_subsystem_for_linux = settings.windows_subsystem_for_linux()
+        if resume is not None and self.resumes.get(self.view.id()) != resume:  # if command has been run again
+            return
+        trace = HDL_Automation_trace('Scope Name')  # measure phases of command
+        config = settings.snapshot()  # get settings
+        trace.lap('settings')
 
         view = self.view  # get current view
         file_name = view.file_name()  # get current file path
@@ -39,86 +56,114 @@ class ScopeNameCommand(sublime_plugin.TextCommand):
             path_root, path_ext = os.path.splitext(path_basename)  # split the current file path into root and extension
             # if file extension is an Verilog or SystemVerilog extension
             if path_ext.lower() in ['.v', '.vh', '.sv', '.svh']:
-                view_size = view.size()  # get number of character in current file
-                sublime_region = sublime.Region(0, view_size)  # get region containing current file content
-                content = view.substr(sublime_region)  # get content of the region as a string
-                content = content.encode()  # convert current file content to byte string
-
-                process = []  # create list of process parameters
-                if windows_subsystem_for_linux:  # if user has Verible under Windows Subsystem for Linux
-                    process.append('wsl')  # run the Verible under Windows Subsystem for Linux
-                process.append('verible-verilog-syntax')  # use Verible Parser
-                process.append('--printtree')  # Print tree
-                process.append(f"-")  # to pipe from stdin
-
-                try:  # prevent CalledProcessError
-                    output = subprocess.check_output(
-                        process,  # pass process parameters
-                        input=content,  # pass current file content to stdin
-                        shell=True  # execute subprocess through the shell
-                    )  # run command with arguments and return its output
-                except subprocess.CalledProcessError as err:  # if called process returns a non-zero return code
-                    print(f"HDL_Automation: Subprocess failed with `{err.returncode}` return code")
-                else:  # if subprocess has run successfully
-                    output = output.decode('utf-8')  # convert byte string to UTF-8
-                    lines = output.splitlines()  # split output to lines
-                    selections = view.sel()  # get user selections
-                    sel = []
-                    line_ranges = ''  # initialize parameter which specify lines to format
-                    for key, selection in enumerate(selections):  # for each selection
-                        sel.append(selection.end())  # get ending point of selection
-                    sel.sort()
-                    sel_pos = 0
-                    tags = []
-                    for line in lines:
-                        sel_active = False
-                        if sel_pos < len(sel):
-                            match = re.search(r'@([\d]+)-([\d]+):', line)
-                            if match:
-                                if int(match.group(1)) > sel[sel_pos]:
-                                    sel_active = True
-                                    sel_pos += 1
-                        match = re.match(r'[\s]*Node @[\d]+ \(tag: (.+)\) {', line)
-                        if match:
-                            tags.append({
-                                'tag': match.group(1)
-                            })
-                        match = re.match(r'[\s]*}', line)
-                        if match:
-                            if 'identifier' in tags[-1].keys():
-                                if len(tags) >= 2 and 'identifier' not in tags[-2].keys():
-                                    tags[-2]['identifier'] = tags[-1]['identifier']
-                            del tags[-1]
-                        match = re.match(r'[\s]*Leaf @[\d]+ \(#SymbolIdentifier @[\d]+-[\d]+: "([a-zA-Z_][a-zA-Z0-9_$]*)"\)', line)
-                        if match:
-                            if 'identifier' not in tags[-1].keys():
-                                tags[-1]['identifier'] = match.group(1)
-                        if sel_active:
-                            content = ''
-                            for tag in tags:
-                                if tag['tag'] == 'kModuleDeclaration' and 'identifier' in tag.keys():
-                                    content += f"<div>"
-                                    content += f"<span style='color:var(--redish)'>"
-                                    content += f"module"
-                                    content += f"</span>"
-                                    content += f" "
-                                    content += f"<span style='color:var(--bluish)'>"
-                                    content += f"{tag['identifier']}"
-                                    content += f"</span>"
-                                    content += f"</div>"
-                                if tag['tag'] == 'kInstantiationBase' and 'identifier' in tag.keys():
-                                    content += f"<div>"
-                                    content += f"<span style='color:var(--bluish)'>"
-                                    content += f"{tag['identifier']}"
-                                    content += f"</span>"
-                                    for tag2 in tags:
-                                        if tag2['tag'] == 'kGateInstance' and 'identifier' in tag2.keys():
-                                            content += f" "
-                                            content += f"<span style='color:var(--bluish)'>"
-                                            content += f"{tag['identifier']}"
-                                            content += f"</span>"
-                                    content += f"</div>"
-                            view.show_popup(content, location=-1)
+                guess = None  # scopes found without Verible
+                offsets = [selection.end() for selection in view.sel()]  # get ending point of each selection
+                strategy = policy.strategy(view, config)  # inspect large files with built-in tokenizer only
+                if config.scope_scanner or strategy == 'tokens':  # if built-in tokenizer should answer first
+                    guess, ambiguous = scope_scanner.scan(view, offsets)  # find scopes without Verible
+                    trace.lap('scan')
+                    if guess is None:  # if large file has been scanned only partly
+                        self.resume(view)
+                        return
+                    self.resumes.pop(view.id(), None)  # scan is complete
+                    if ambiguous and strategy == 'tokens':  # if Verible would be needed but file is too large
+                        sublime.status_message(
+                            "HDL_Automation: Scope Name found by tokenizer only, file is larger than "
+                            "`syntax_tree_size_limit` and preprocessor directives may change it"
+                        )
+                    if not ambiguous or strategy == 'tokens':  # if scanner is sure about every scope or has to be
+                        self.show(guess)
+                        trace.lap('apply')
+                        timings.add(trace)
+                        return
+                tree = syntax_tree_cache.get(view)  # get syntax tree of unchanged buffer without reading it
+                if tree is None:  # if buffer has changed since last lookup
+                    tree = live_trees.get(view, offsets)  # reuse last syntax tree when edits are elsewhere
+                if tree is None:  # if edits may have changed enclosing scopes
+                    if not policy.affordable(view, config, 'Scope Name', 2):  # if content and parse do not fit memory
+                        return
+                    text = None  # content as a string is needed by language server only
+                    if config.language_server:  # if user prefers language server
+                        text = view.substr(sublime.Region(0, view.size()))  # get content of file as a string
+                    content = policy.content(view)  # get current file content as byte string
+                    digest = syntax_tree_cache.digest(content)  # get hash of current file content
+                    tree = syntax_tree_cache.find(view, digest)  # get syntax tree of the same content
+                    if tree is not None:  # if the same content has been parsed before
+                        live_trees.put(view, tree)  # answer next queries from this syntax tree
+                trace.lap('extract')
+                if tree is None:  # if current file content has never been parsed
+                    process = config.syntax_process  # export syntax tree of stdin
+                    server = None  # parse through subprocess by default
+                    if config.language_server:  # if user prefers language server
+                        server = language_servers.get(view, config.language_server_process)  # get server of window
+                        if server is not None:  # if server is running
+                            server.sync(view, text)  # make sure server knows current file content
+                    jobs.submit(
+                        view,  # run request for current view
+                        'Scope Name',  # cancel older Scope Name requests of current view
+                        lambda job: self.parse(job, process, content, server, text, guess),  # parse in background
+                        lambda tree: self.parsed(digest, tree, guess),  # show popup when file content is still the same
+                        trace=trace  # continue measuring phases in background
+                    )
+                else:  # if syntax tree is available
+                    self.show(tree)
+                    trace.lap('apply')
+                    timings.add(trace)
+
+    def resume(self, view):
+        '''Show scanning progress and scan next slice of large file once editor has responded'''
+        resume = self.resumes.get(view.id(), 0) + 1  # identify continuation
+        self.resumes[view.id()] = resume  # ignore older continuations
+        sublime.status_message(f"HDL_Automation: Scope Name scanning {scope_scanner.progress(view)}%")
+        sublime.set_timeout(lambda: view.run_command('scope_name', {'resume': resume}) if view.is_valid() else None)
+
+    def parse(self, job, process, content, server=None, text=None, guess=None):
+        '''Index syntax tree of content in background, guess is returned when Verible fails'''
+        if server is not None:  # if language server is running
+            try:  # prevent HDL_Automation_language_server_error
+                symbols = server.symbols(job)  # get document symbols
+                job.trace.lap('language server')
+                return HDL_Automation_scope_tree.from_symbols(symbols, text)  # index document symbols
+            except HDL_Automation_language_server_error as err:  # if language server has failed
+                print(f"HDL_Automation: Language server failed with `{err}`, parsing through subprocess")
+        try:  # prevent CalledProcessError and ValueError
+            # index syntax tree while subprocess prints it
+            tree = HDL_Automation_scope_tree.from_printtree(job.stream(process, content), content)
+            job.trace.lap('tree')
+            return tree
+        except subprocess.CalledProcessError as err:  # if called process returns a non-zero return code
+            print(f"HDL_Automation: Subprocess failed with `{err.returncode}` return code")
+            return guess
+        except OSError as err:  # if Verible cannot be started
+            print(f"HDL_Automation: Subprocess could not be started, `{err}`")
+            return guess
+        except HDL_Automation_missing_tool:  # if Verible is not installed, reported when plugin is loaded
+            return guess
+        except ValueError:  # if output is not a syntax tree
+            print(f"HDL_Automation: Syntax tree could not be read")
+            return guess
+
+    def parsed(self, digest, tree, guess=None):
+        '''Remember syntax tree of unchanged file content and show it'''
+        if tree is not guess:  # if tree comes from Verible
+            syntax_tree_cache.put(self.view, digest, tree, tree.size())  # remember syntax tree of content
+            live_trees.put(self.view, tree)  # answer next queries from this syntax tree
+        self.show(tree)
+
+    def show(self, tree):
+        '''Show modules and instances enclosing each selection'''
+        view = self.view  # get current view
+        content = ''  # initialize popup content
+        scopes = []  # initialize list of already shown scopes
+        for selection in view.sel():  # for each selection
+            scope = tree.chain(selection.end())  # get scopes enclosing ending point of selection
+            if scope and scope not in scopes:  # if selection is inside not shown scope
+                scopes.append(scope)  # mark scope as shown
+                if content:  # if popup already shows another scope
+                    content += f"<br>"  # separate scopes
+                content += tree.html(scope)  # describe scope
+        if content:  # if any selection is inside a scope
+            view.show_popup(content, location=-1)
 
     def is_visible(self):
         '''
@@ -135,28 +180,13 @@ class ScopeNameCommand(sublime_plugin.TextCommand):
         return False  # otherwise disable format command
 
 class FormatCommand(sublime_plugin.TextCommand):
-    def run(self, args):
+    def run(self, args, save=False):
         '''
-        Called when the format command is run
+        Called when the format command is run, save formats whole file and saves it afterwards
         '''
-        # get settings
-        settings.reload()
-        assignment_statement_alignment = settings.assignment_statement_alignment()
-        case_items_alignment = settings.case_items_alignment()
-        class_member_variables_alignment = settings.class_member_variables_alignment()
-        expand_coverpoints = settings.expand_coverpoints()
-        formal_parameters_alignment = settings.formal_parameters_alignment()
-        formal_parameters_indentation = settings.formal_parameters_indentation()
-        named_parameter_alignment = settings.named_parameter_alignment()
-        named_parameter_indentation = settings.named_parameter_indentation()
-        named_port_alignment = settings.named_port_alignment()
-        named_port_indentation = settings.named_port_indentation()
-        net_variable_alignment = settings.net_variable_alignment()
-        port_declarations_alignment = settings.port_declarations_alignment()
-        port_declarations_indentation = settings.port_declarations_indentation()
-        struct_union_members_alignment = settings.struct_union_members_alignment()
-        try_wrap_long_lines = settings.try_wrap_long_lines()
-        windows_subsystem_for_linux = settings.windows_subsystem_for_linux()
+        trace = HDL_Automation_trace('Format')  # measure phases of command
+        config = settings.snapshot()  # get settings
+        trace.lap('settings')
 
         view = self.view  # get current view
         file_name = view.file_name()  # get current file path
@@ -165,54 +195,148 @@ class FormatCommand(sublime_plugin.TextCommand):
             path_root, path_ext = os.path.splitext(path_basename)  # split the current file path into root and extension
             # if file extension is an Verilog or SystemVerilog extension
             if path_ext.lower() in ['.v', '.vh', '.sv', '.svh']:
+                # if content, output and its conversions do not fit memory
+                if not policy.affordable(view, config, 'Format', 5):
+                    if save:  # if file is formatted on save
+                        save_queue.finished(view)  # let next file be formatted on save
+                    return
                 view_size = view.size()  # get number of character in current file
                 sublime_region = sublime.Region(0, view_size)  # get region containing current file content
-                content = view.substr(sublime_region)  # get content of the region as a string
-                content = content.encode()  # convert current file content to byte string
-
-                line_ranges = self.get_sel_line_ranges(view)  # get selection line ranges
-
-                process = []  # create list of process parameters
-                if windows_subsystem_for_linux:  # if user has Verible under Windows Subsystem for Linux
-                    process.append('wsl')  # run the Verible under Windows Subsystem for Linux
-                process.append('verible-verilog-format')  # use Verible Formatter
-                # pass settings
-                process.append(f"--assignment_statement_alignment={assignment_statement_alignment}")
-                process.append(f"--case_items_alignment={case_items_alignment}")
-                process.append(f"--class_member_variables_alignment={class_member_variables_alignment}")
-                process.append(f"--formal_parameters_alignment={formal_parameters_alignment}")
-                process.append(f"--formal_parameters_indentation={formal_parameters_indentation}")
-                process.append(f"--named_parameter_alignment={named_parameter_alignment}")
-                process.append(f"--named_parameter_indentation={named_parameter_indentation}")
-                process.append(f"--named_port_alignment={named_port_alignment}")
-                process.append(f"--named_port_indentation={named_port_indentation}")
-                process.append(f"--net_variable_alignment={net_variable_alignment}")
-                process.append(f"--port_declarations_alignment={port_declarations_alignment}")
-                process.append(f"--port_declarations_indentation={port_declarations_indentation}")
-                process.append(f"--struct_union_members_alignment={struct_union_members_alignment}")
-                process.append(f"--try_wrap_long_lines={try_wrap_long_lines}")
-                process.append(f"--expand_coverpoints={expand_coverpoints}")
+                text = view.substr(sublime_region)  # get content of the region as a string
+                content = text.encode()  # convert current file content to byte string
+
+                line_ranges = None  # lines to format, known from selections unless file is formatted partly
+                if config.partial_format and not save:  # if only edited constructs should be formatted
+                    regions = [(selection.begin(), selection.end()) for selection in view.sel()]  # get selections
+                    regions += dirty_lines.get(view)  # add lines edited since last format
+                    if policy.strategy(view, config) == 'tokens':  # if file is too large to be parsed
+                        line_ranges = self.get_line_ranges(view, regions)  # format edited lines only
+                    else:  # if top level constructs can be found
+                        digest = syntax_tree_cache.digest(content)  # get hash of current file content
+                        tree = syntax_tree_cache.get(view) or syntax_tree_cache.find(view, digest)  # get cached parse
+                        trace.lap('extract')
+                        jobs.submit(
+                            view,  # run request for current view
+                            'Format',  # cancel older Format requests of current view
+                            lambda job: self.format_partial(job, config, content, text, tree, regions),  # format slices
+                            lambda result: self.formatted_partial(digest, *result),  # apply slices if file is the same
+                            trace=trace  # continue measuring phases in background
+                        )
+                        return
+
+                if line_ranges is None:  # if lines are not known yet
+                    line_ranges = '' if save else self.get_sel_line_ranges(view)  # get selection line ranges
+                trace.lap('extract')
+
+                process = config.format_process  # format whole file from stdin
                 if line_ranges:  # if user select specific lines to format
-                    process.append(f"--lines={line_ranges}")  # specify lines to format
-                process.append(f"-")  # to pipe from stdin
-
-                try:  # prevent CalledProcessError
-                    output = subprocess.check_output(
-                        process,  # pass process parameters
-                        input=content,  # pass current file content to stdin
-                        shell=True  # execute subprocess through the shell
-                    )  # run command with arguments and return its output
-                except subprocess.CalledProcessError as err:  # if called process returns a non-zero return code
-                    print(f"HDL_Automation: Subprocess failed with `{err.returncode}` return code")
-                else:  # if subprocess has run successfully
-                    output = output.decode('utf-8')  # convert byte string to UTF-8
-                    lines = output.splitlines()  # split output to lines
-                    for key, line in enumerate(lines):  # for each line
-                        match = re.match('( +)', line)  # search for leading spaces
-                        if match:  # if line contain leading spaces
-                            lines[key] = '\t' * (len(match.group(1)) // 2) + line.lstrip()  # convert spaces to tabs
-                    output = '\n'.join(lines) + '\n'  # concatenate lines
-                    view.replace(args, sublime_region, output)  # replace old file content with formated file content
+                    process = process[:-1] + (f"--lines={line_ranges}", process[-1])  # specify lines to format
+                fingerprint = config.fingerprint  # identify formatter settings
+
+                server = None  # format through subprocess by default
+                if config.language_server and ',' not in line_ranges:  # if server can format requested lines
+                    server = language_servers.get(view, config.language_server_process)  # get server of window
+                    if server is not None:  # if server is running
+                        server.sync(view, text)  # make sure server knows current file content
+
+                jobs.submit(
+                    view,  # run request for current view
+                    'Format',  # cancel older Format requests of current view
+                    lambda job: self.format(job, process, content, server, text, line_ranges),  # format in background
+                    lambda output: self.formatted(text, output, save, fingerprint),  # apply output if file is the same
+                    lambda: save_queue.finished(view) if save else None,  # let next file be formatted on save
+                    trace=trace  # continue measuring phases in background
+                )
+
+    def format(self, job, process, content, server=None, text=None, line_ranges=''):
+        '''Format content in background'''
+        if server is not None:  # if language server is running
+            try:  # prevent HDL_Automation_language_server_error
+                output = server.format(job, text, line_ranges)  # format through language server
+                job.trace.lap('language server')
+                output = self.convert(output)  # convert indentation
+                job.trace.lap('convert')
+                return output
+            except HDL_Automation_language_server_error as err:  # if language server has failed
+                print(f"HDL_Automation: Language server failed with `{err}`, formatting through subprocess")
+        try:  # prevent CalledProcessError
+            output = job.communicate(process, content)  # run command with arguments and return its output
+        except subprocess.CalledProcessError as err:  # if called process returns a non-zero return code
+            print(f"HDL_Automation: Subprocess failed with `{err.returncode}` return code")
+            return None
+        output = output.decode('utf-8')  # convert byte string to UTF-8
+        job.trace.lap('decode')
+        output = self.convert(output)  # convert indentation
+        job.trace.lap('convert')
+        return output
+
+    def format_partial(self, job, config, content, text, tree, regions):
+        '''Format whole top level constructs touching regions in background, return syntax tree and changed slices'''
+        if tree is None:  # if no parse of current content is cached
+            try:  # prevent CalledProcessError and ValueError
+                # parse whole file, cheaper than format
+                tree = HDL_Automation_scope_tree.from_printtree(job.stream(config.syntax_process, content), content)
+            except (subprocess.CalledProcessError, ValueError, HDL_Automation_missing_tool):  # if file cannot be parsed
+                tree = None
+            job.trace.lap('tree')
+        constructs = tree.constructs(regions) if tree is not None else []  # get constructs to format
+        if not constructs:  # if edits are outside of any construct
+            output = self.format(job, config.format_process, content)  # format whole file
+            return tree, [(0, text, output)] if output is not None else None
+        slices = []  # starting offset, current and formatted text of each formatted slice
+        for index in constructs:  # for each construct from the first one
+            start = text.rfind('\n', 0, tree.top_starts[index]) + 1  # extend construct to whole lines
+            end = text.find('\n', tree.top_ends[index])
+            end = len(text) if end < 0 else end + 1
+            if slices and start < slices[-1][0] + len(slices[-1][1]):  # if construct shares a line with previous
+                start = slices.pop()[0]  # format both constructs together
+            slices.append((start, text[start:end], None))
+        for key, (start, current, formatted) in enumerate(slices):  # for each slice
+            try:  # prevent CalledProcessError
+                output = job.communicate(config.format_process, current.encode())  # format only slice
+            except subprocess.CalledProcessError as err:  # if called process returns a non-zero return code
+                print(f"HDL_Automation: Subprocess failed with `{err.returncode}` return code")
+                return tree, None
+            job.trace.lap('verible')
+            formatted = self.convert(output.decode('utf-8'))  # convert indentation
+            if not current.endswith('\n'):  # if slice ends the file without line ending
+                formatted = formatted[:-1]
+            slices[key] = (start, current, formatted)
+            job.trace.lap('convert')
+        return tree, slices
+
+    def formatted_partial(self, digest, tree, slices):
+        '''Remember syntax tree of unchanged file content and replace formatted slices'''
+        view = self.view  # get current view
+        if tree is not None:  # if file content has been parsed
+            syntax_tree_cache.put(view, digest, tree, tree.size())  # remember syntax tree of content
+            live_trees.put(view, tree)  # answer Scope Name from this syntax tree
+        if slices is not None:  # if all slices have been formatted
+            FormatApplyCommand.outputs[view.id()] = slices  # pass slices to edit command
+            view.run_command('format_apply')  # replace slices in a single undo step
+
+    leading_spaces = re.compile(r'^( +)[ \t]*', re.M)  # indentation of each line starting with spaces
+
+    @classmethod
+    def convert(cls, output):
+        '''Convert leading spaces of formatted content to tabs in a single pass'''
+        terminated = output.endswith('\n')  # check line ending before last line may become empty
+        output = cls.leading_spaces.sub(lambda match: '\t' * (len(match.group(1)) // 2), output)  # convert spaces
+        if '\r' in output:  # if output has Windows line endings
+            output = output.replace('\r\n', '\n')
+        if not terminated:  # if last line has no line ending
+            output += '\n'
+        return output
+
+    def formatted(self, text, output, save=False, fingerprint=None):
+        '''Replace unchanged file content with formatted file content'''
+        view = self.view  # get current view
+        FormatApplyCommand.outputs[view.id()] = [(0, text, output)]  # pass both contents to edit command
+        view.run_command('format_apply')  # replace file content in a single undo step
+        if save:  # if file is formatted on save
+            format_cache.put(view.file_name(), format_cache.digest(output.encode()), fingerprint)  # skip next time
+            if output != text:  # if saved file was not formatted
+                view.run_command('save')  # save formatted file
 
     def is_visible(self):
         '''
@@ -243,17 +367,500 @@ class FormatCommand(sublime_plugin.TextCommand):
             line_ranges = line_ranges[:-1]  # remove last comma
         return line_ranges
 
+    def get_line_ranges(self, view, regions):
+        '''Convert (start, end) character regions to 1-based, comma-separated, N-M ranges'''
+        lines = sorted({(view.rowcol(begin)[0] + 1, view.rowcol(end)[0] + 1) for begin, end in regions})
+        return ','.join(f"{first}-{last}" for first, last in lines)
+
+
+class FormatApplyCommand(sublime_plugin.TextCommand):
+    outputs = {}  # starting offset, current and formatted content of each formatted slice by view id
+
+    def run(self, args):
+        '''
+        Called when formatted file content is ready to replace current file content
+        '''
+        view = self.view  # get current view
+        slices = self.outputs.pop(view.id(), None)  # get current and formatted slices
+        if slices is not None:  # if format command has finished
+            for offset, text, output in reversed(slices):  # for each slice from the last one
+                for start, end, lines in self.get_hunks(text, output):  # for each changed hunk from the last one
+                    view.replace(args, sublime.Region(offset + start, offset + end), lines)  # replace changed lines
+            dirty_lines.formatted(view)  # forget edits made before format
+
+    def get_hunks(self, text, output):
+        '''Return changed line hunks as (start, end, new lines) tuples ordered from the end of text'''
+        if text == output:  # if file is already formatted
+            return []
+        old_lines = text.splitlines(True)  # split current content to lines with line endings
+        new_lines = output.splitlines(True)  # split formatted content to lines with line endings
+        prefix = 0  # number of unchanged lines at the beginning
+        limit = min(len(old_lines), len(new_lines))
+        while prefix < limit and old_lines[prefix] == new_lines[prefix]:  # while lines are equal
+            prefix += 1
+        suffix = 0  # number of unchanged lines at the end
+        limit -= prefix
+        while suffix < limit and old_lines[-1 - suffix] == new_lines[-1 - suffix]:  # while lines are equal
+            suffix += 1
+        offsets = [0]  # character offset of each current line
+        for line in old_lines:  # for each current line
+            offsets.append(offsets[-1] + len(line))
+        if len(old_lines) == len(new_lines):  # if lines are only reindented or rewritten in place
+            opcodes = []  # compare lines pairwise, SequenceMatcher is quadratic on repetitive lines
+            for index in range(len(old_lines) - prefix - suffix):  # for each line of changed part
+                if old_lines[prefix + index] != new_lines[prefix + index]:  # if line has changed
+                    if opcodes and opcodes[-1][2] == index:  # if previous line has changed too
+                        opcodes[-1] = ('replace', opcodes[-1][1], index + 1, opcodes[-1][3], index + 1)
+                    else:
+                        opcodes.append(('replace', index, index + 1, index, index + 1))
+        else:  # if lines have been added or removed
+            opcodes = difflib.SequenceMatcher(
+                None,  # compare all lines
+                old_lines[prefix:len(old_lines) - suffix],  # changed part of current content
+                new_lines[prefix:len(new_lines) - suffix]  # changed part of formatted content
+            ).get_opcodes()
+        hunks = []
+        for tag, old_begin, old_end, new_begin, new_end in opcodes:  # for each difference
+            if tag != 'equal':  # if lines have changed
+                hunks.append((
+                    offsets[prefix + old_begin],  # start of changed current lines
+                    offsets[prefix + old_end],  # end of changed current lines
+                    ''.join(new_lines[prefix + new_begin:prefix + new_end])  # formatted lines
+                ))
+        hunks.reverse()  # replace from the end so earlier offsets stay valid
+        return hunks
+
+    def is_visible(self):
+        '''
+        Returns False because the format_apply command is used only by the format command
+        '''
+        return False
+
+
+class FormatFilesCommand(sublime_plugin.WindowCommand):
+    def run(self, dirs=None, files=None):
+        '''
+        Called when the format_files command is run
+        '''
+        config = settings.snapshot()  # get settings
+
+        window = self.window  # get current window
+        if window.id() in batches:  # if window is already formatting files
+            sublime.status_message('HDL_Automation: Format Files is already running')
+            return
+        if not dirs and not files:  # if no folder has been chosen
+            dirs = window.folders()  # format project folders
+        paths = []  # Verilog and SystemVerilog files to format
+        for file_name in files or []:  # for each chosen file
+            path_root, path_ext = os.path.splitext(file_name)  # split the file path into root and extension
+            if path_ext.lower() in ['.v', '.vh', '.sv', '.svh']:  # if file is a Verilog or SystemVerilog file
+                paths.append(file_name)
+        for folder in dirs or []:  # for each chosen folder
+            for root, folder_names, file_names in os.walk(folder):  # for each nested folder
+                folder_names[:] = [name for name in folder_names if not name.startswith('.')]  # skip hidden folders
+                for file_name in file_names:  # for each file of folder
+                    path_root, path_ext = os.path.splitext(file_name)  # split the file name into root and extension
+                    if path_ext.lower() in ['.v', '.vh', '.sv', '.svh']:  # if file is Verilog or SystemVerilog
+                        paths.append(os.path.join(root, file_name))
+        unsaved = set()  # files with unsaved changes
+        for view in window.views():  # for each opened file
+            if view.file_name() is not None and view.is_dirty():  # if file has unsaved changes
+                unsaved.add(os.path.normcase(view.file_name()))
+
+        batch = HDL_Automation_batch(window, config.format_process, sorted(set(paths)), unsaved, config.memory_budget)
+        batches[window.id()] = batch
+        batch.start()
+
+    def is_enabled(self, dirs=None, files=None):
+        '''
+        Returns True if the format_files command is able to be run at this time
+        '''
+        return self.window.id() not in batches
+
+
+class FormatFilesCancelCommand(sublime_plugin.WindowCommand):
+    def run(self):
+        '''
+        Called when the format_files_cancel command is run
+        '''
+        batch = batches.get(self.window.id())  # get running batch of current window
+        if batch is not None:  # if window is formatting files
+            batch.cancel()
+
+    def is_enabled(self):
+        '''
+        Returns True if the format_files_cancel command is able to be run at this time
+        '''
+        return self.window.id() in batches
+
+
+class GotoModuleDefinitionCommand(sublime_plugin.TextCommand):
+    def run(self, args):
+        '''
+        Called when the goto_module_definition command is run
+        '''
+        view = self.view  # get current view
+        window = view.window()  # get window of current view
+        index = module_indexes.get(window)  # get module index of project
+        if index is None:  # if window has no project folders
+            sublime.status_message('HDL_Automation: Go to Module Definition requires project folders')
+            return
+        if not view.sel():  # if view has no cursor
+            return
+        name = view.substr(view.word(view.sel()[0]))  # get word under cursor
+        definitions = index.definitions(name)  # find declarations of word
+        if not definitions:  # if word is not declared in project
+            message = 'is being indexed' if index.refreshing else 'is not declared in project'
+            sublime.status_message(f"HDL_Automation: `{name}` {message}")
+            return
+        items = [
+            sublime.QuickPanelItem(f"{kind} {name}", path, ', '.join(json.loads(ports)))
+            for path, kind, row, col, ports in definitions
+        ]
+        if len(definitions) == 1:  # if declaration is unique
+            self.open(window, definitions[0])
+        else:  # if module is declared in several files
+            window.show_quick_panel(items, lambda selected: selected >= 0 and self.open(window, definitions[selected]))
+
+    @staticmethod
+    def open(window, definition):
+        '''Open file of definition at its position'''
+        path, kind, row, col = definition[:4]
+        window.open_file(f"{path}:{row + 1}:{col + 1}", sublime.ENCODED_POSITION)
+
+    def is_enabled(self, args=None):
+        '''
+        Returns True if the goto_module_definition command is able to be run at this time
+        '''
+        window = self.view.window()  # get window of current view
+        return window is not None and bool(window.folders())
+
+
+class ShowInstantiationHierarchyCommand(sublime_plugin.TextCommand):
+    depth_limit = 16  # maximal number of shown hierarchy levels
+    item_limit = 1000  # maximal number of shown items
+
+    def run(self, args):
+        '''
+        Called when the show_instantiation_hierarchy command is run
+        '''
+        view = self.view  # get current view
+        window = view.window()  # get window of current view
+        index = module_indexes.get(window)  # get module index of project
+        if index is None:  # if window has no project folders
+            sublime.status_message('HDL_Automation: Show Instantiation Hierarchy requires project folders')
+            return
+        if not view.sel():  # if view has no cursor
+            return
+        name = view.substr(view.word(view.sel()[0]))  # get word under cursor
+        if not index.definitions(name) and view.file_name() is not None:  # if word is not a declared module
+            name = index.enclosing(view.file_name(), view.sel()[0].begin())  # use module enclosing cursor
+        if not name:  # if cursor is outside of any module
+            message = 'is being indexed' if index.refreshing else 'has no module under cursor'
+            sublime.status_message(f"HDL_Automation: Project {message}")
+            return
+
+        items = []  # shown quick panel items
+        positions = []  # path, row and column of each item, None when item has no location
+        parents = index.parents(name)  # get instances of module
+        for parent, instance, path, row, col in parents:  # for each instance of module
+            items.append(sublime.QuickPanelItem(f"\u2191 {parent}", f"{instance} : {name}", os.path.basename(path)))
+            positions.append((path, row, col))
+        for path, kind, row, col, ports in index.definitions(name)[:1]:  # for declaration of module
+            items.append(sublime.QuickPanelItem(f"{kind} {name}", ', '.join(json.loads(ports)), os.path.basename(path)))
+            positions.append((path, row, col))
+        if not self.children(index, name, 1, [name], items, positions, {}):  # if nested instances are cut
+            details = f"further instances are not shown, limit is {self.item_limit} items"  # explain cut
+            items.append(sublime.QuickPanelItem('\u2026', details))
+            positions.append(None)
+        window.show_quick_panel(
+            items,
+            lambda selected: selected >= 0 and self.open(window, positions[selected]),
+            selected_index=len(parents)  # select module itself
+        )
+
+    def children(self, index, module, depth, path, items, positions, instances):
+        '''Add instances of module and their nested instances, instances of each module are queried once, return
+        False when item limit has been reached'''
+        if module not in instances:  # if instances inside module have not been queried yet
+            instances[module] = index.children(module)
+        for child, instance, file_name, row, col in instances[module]:  # for each instance inside module
+            if len(items) >= self.item_limit:  # if enough instances are shown
+                return False
+            recursive = child in path  # True if instance would repeat hierarchy
+            details = 'recursive instantiation' if recursive else os.path.basename(file_name)
+            items.append(sublime.QuickPanelItem(f"{'  ' * depth}{instance} : {child}", '', details))
+            positions.append((file_name, row, col))
+            if not recursive and depth < self.depth_limit:  # if instance can be expanded
+                if not self.children(index, child, depth + 1, path + [child], items, positions, instances):
+                    return False
+        return True
+
+    def open(self, window, position):
+        '''Open file at 0-based row and column of selected item'''
+        if position is not None:  # if item has location
+            path, row, col = position
+            window.open_file(f"{path}:{row + 1}:{col + 1}", sublime.ENCODED_POSITION)
+
+    def is_enabled(self, args=None):
+        '''
+        Returns True if the show_instantiation_hierarchy command is able to be run at this time
+        '''
+        window = self.view.window()  # get window of current view
+        return window is not None and bool(window.folders())
+
+
+class TimingReportCommand(sublime_plugin.WindowCommand):
+    def run(self):
+        '''
+        Called when the timing_report command is run
+        '''
+        window = self.window  # get current window
+        config = settings.snapshot()  # get settings
+        panel = window.create_output_panel('HDL_Automation_timings')  # get report panel
+        panel.run_command('append', {'characters': timings.report()})  # show phase durations
+        window.run_command('show_panel', {'panel': 'output.HDL_Automation_timings'})
+        sublime.set_timeout_async(  # measure startup costs without blocking
+            lambda: panel.run_command('append', {'characters': timings.baseline(config)})
+        )
+
+
+class HDL_Automation_batch:
+    '''Format many files in parallel and report progress in output panel'''
+
+    copies = 5  # estimated peak memory of formatting a file as multiple of its size, content, output and conversions
+
+    def __init__(self, window, process, paths, unsaved, budget=0):
+        '''Prepare formatting of paths with process parameters, skipping unsaved files, budget limits memory held by
+        all workers together in bytes'''
+        self.window = window  # window which shows report
+        self.process = process  # Verible Formatter parameters
+        self.paths = paths  # files to format
+        self.unsaved = unsaved  # files with unsaved changes
+        self.allowance = HDL_Automation_allowance(budget)  # memory budget shared by workers
+        self.cancelled = threading.Event()  # set when user cancels formatting
+        self.lock = threading.Lock()  # guard running subprocesses
+        self.running = set()  # running subprocesses
+        self.panel = window.create_output_panel('HDL_Automation')  # create report panel
+
+    def start(self):
+        '''Show report panel and start formatting in background'''
+        self.window.run_command('show_panel', {'panel': 'output.HDL_Automation'})
+        self.report(f"HDL_Automation: Formatting {len(self.paths)} files with {os.cpu_count() or 1} workers\n")
+        threading.Thread(target=self.work, name='HDL_Automation_batch', daemon=True).start()
+
+    def report(self, line):
+        '''Append line to report panel'''
+        sublime.set_timeout(lambda: self.panel.run_command('append', {
+            'characters': line,  # report line
+            'force': True,  # append to read-only panel
+            'scroll_to_end': True  # keep latest line visible
+        }))
+
+    def work(self):
+        '''Format all files using one Verible Formatter per CPU'''
+        start = time.perf_counter()  # remember starting time
+        results = collections.Counter()  # number of files by result
+        size = 0  # number of formatted bytes
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            futures = {executor.submit(self.format, path): path for path in self.paths}  # format each file
+            for future in concurrent.futures.as_completed(futures):  # for each finished file
+                path = futures[future]
+                try:  # prevent unexpected failures of single file
+                    result, detail, file_size, duration = future.result()
+                except concurrent.futures.CancelledError:  # if file has not been started before cancellation
+                    result, detail, file_size, duration = 'cancelled', '', 0, 0
+                except Exception as err:  # if file cannot be formatted
+                    result, detail, file_size, duration = 'failed', str(err), 0, 0
+                results[result] += 1
+                size += file_size
+                if result != 'cancelled':  # if file has been processed
+                    line = f"{result:9} {path} ({duration:.2f} s)"
+                    if detail:  # if result has details
+                        line += f": {detail}"
+                    self.report(line + '\n')
+                if self.cancelled.is_set():  # if user has cancelled formatting
+                    for pending in futures:  # for each file
+                        pending.cancel()  # do not start file
+        elapsed = time.perf_counter() - start  # get total time
+        summary = ', '.join(f"{count} {result}" for result, count in sorted(results.items()))
+        self.report(
+            f"HDL_Automation: {summary or 'no files'} in {elapsed:.2f} s"
+            f" ({sum(results.values()) / max(elapsed, 1e-9):.1f} files/s,"
+            f" {size / 1024 / 1024 / max(elapsed, 1e-9):.2f} MB/s)\n"
+        )
+        sublime.set_timeout(lambda: batches.pop(self.window.id(), None))  # allow next batch
+
+    def format(self, path):
+        '''Format single file and return result, details, size and duration'''
+        start = time.perf_counter()  # remember starting time
+        if self.cancelled.is_set():  # if user has cancelled formatting
+            return 'cancelled', '', 0, 0
+        if os.path.normcase(path) in self.unsaved:  # if file has unsaved changes in editor
+            return 'skipped', 'unsaved changes', 0, time.perf_counter() - start
+        needed = os.path.getsize(path) * self.copies  # estimate peak memory of file
+        if not self.allowance.fits(needed):  # if file alone exceeds memory budget
+            detail = f"needs about {needed // (1024 * 1024)} MB, above `memory_budget`"  # explain skipped file
+            return 'skipped', detail, 0, time.perf_counter() - start
+        if not self.allowance.acquire(needed, self.cancelled):  # if user has cancelled while waiting for memory
+            return 'cancelled', '', 0, 0
+        try:  # make sure memory is returned to other workers
+            return self.format_file(path, start)
+        finally:
+            self.allowance.release(needed)
+
+    def format_file(self, path, start):
+        '''Run Verible Formatter on file and write formatted content, return result, details, size and duration'''
+        with open(path, 'rb') as file:  # read file content
+            content = file.read()
+        process = tools.popen(
+            self.process,  # pass process parameters
+            stdin=subprocess.PIPE,  # pass file content to stdin
+            stdout=subprocess.PIPE,  # collect output
+            stderr=subprocess.PIPE  # collect errors
+        )  # start subprocess
+        with self.lock:  # register subprocess for cancellation
+            self.running.add(process)
+        try:  # make sure subprocess is unregistered
+            output, errors = process.communicate(content)  # wait for subprocess
+        finally:
+            with self.lock:  # unregister subprocess
+                self.running.discard(process)
+        if self.cancelled.is_set():  # if subprocess has been killed by user
+            return 'cancelled', '', 0, 0
+        if process.returncode:  # if subprocess returns a non-zero return code
+            errors = errors.decode('utf-8', 'replace').strip().splitlines()  # get error messages
+            detail = errors[0] if errors else f"`{process.returncode}` return code"
+            return 'failed', detail, len(content), time.perf_counter() - start
+        output = FormatCommand.convert(output.decode('utf-8'))  # convert leading spaces to tabs
+        if b'\r\n' in content:  # if file uses Windows line endings
+            output = output.replace('\n', '\r\n')  # keep line endings
+        output = output.encode('utf-8')  # convert formatted content to byte string
+        if output == content:  # if file is already formatted
+            return 'unchanged', '', len(content), time.perf_counter() - start
+        with open(path, 'wb') as file:  # write formatted content
+            file.write(output)
+        return 'formatted', '', len(content), time.perf_counter() - start
+
+    def cancel(self):
+        '''Stop formatting, files which are already written stay formatted'''
+        self.cancelled.set()  # prevent starting next files
+        with self.lock:  # stop running subprocesses
+            for process in self.running:  # for each running subprocess
+                if process.poll() is None:  # if subprocess is running
+                    process.kill()
+        self.report('HDL_Automation: Cancelling...\n')
+
+
+class HDL_Automation_snapshot(collections.namedtuple('HDL_Automation_snapshot', [
+    'windows_subsystem_for_linux',  # run the Verible under Windows Subsystem for Linux
+    'windows_subsystem_for_linux_warm_up',  # start Windows Subsystem for Linux before it is needed
+    'language_server',  # serve Format and Scope Name from Verible Language Server
+    'format_on_save',  # format files when they are saved
+    'partial_format',  # format only top level constructs containing selections or edits
+    'scope_scanner',  # answer Scope Name from built-in tokenizer before asking Verible
+    'scope_status',  # show modules and instances enclosing first cursor in status bar
+    'lint',  # lint files in background while they are edited
+    'lint_delay',  # idle time in milliseconds before file is linted
+    'slow_command_threshold',  # duration in milliseconds from which commands are logged, 0 disables logging
+    'syntax_tree_cache_size',  # maximal memory of remembered syntax trees in bytes
+    'syntax_tree_size_limit',  # file size in bytes above which only built-in tokenizer inspects file, 0 disables it
+    'memory_budget',  # maximal memory in bytes held by a command, 0 disables it
+    'time_budget',  # duration in seconds after which background requests are stopped, 0 disables it
+    'format_flags',  # Verible Formatter parameters
+    'format_process',  # Verible Formatter arguments formatting whole file from stdin
+    'syntax_process',  # Verible Parser arguments printing syntax tree of stdin
+    'index_process',  # Verible Parser arguments exporting syntax trees of files given as further arguments
+    'language_server_process',  # Verible Language Server arguments
+    'lint_process',  # Verible Linter arguments linting stdin
+    'fingerprint',  # hash identifying formatter settings
+])):
+    '''Immutable validated settings with precomputed Verible arguments'''
+
 
 class HDL_Automation_settings:
     '''Handle HDL_Automation settings'''
 
     def __init__(self):
-        '''Load settings from file'''
-        self.settings = sublime.load_settings('HDL_Automation.sublime-settings')
+        '''Prepare settings which are loaded on first use'''
+        self.settings = None  # Sublime Text settings object
+        self.current = None  # snapshot of current settings
 
-    def reload(self):
-        '''Load settings from file'''
+    def load(self):
+        '''Load settings from file and rebuild snapshot whenever they change'''
         self.settings = sublime.load_settings('HDL_Automation.sublime-settings')
+        self.settings.clear_on_change('HDL_Automation')  # prevent duplicated listeners after plugin reload
+        self.settings.add_on_change('HDL_Automation', self.changed)
+        self.current = self.build()
+        syntax_tree_cache.resize(self.current.syntax_tree_cache_size)  # apply cache memory cap
+
+    def unload(self):
+        '''Stop listening to settings changes'''
+        if self.settings is not None:  # if settings have been loaded
+            self.settings.clear_on_change('HDL_Automation')
+
+    def changed(self):
+        '''Rebuild snapshot after settings file has changed, find Verible again when it runs elsewhere'''
+        previous, self.current = self.current, self.build()
+        syntax_tree_cache.resize(self.current.syntax_tree_cache_size)  # apply cache memory cap
+        if previous is None or any(
+            getattr(previous, name) != getattr(self.current, name)
+            for name in ('windows_subsystem_for_linux', 'lint', 'language_server')
+        ):  # if executables are searched elsewhere or other features need them
+            tools.resolve(self.current)
+
+    def snapshot(self):
+        '''Return snapshot of current settings'''
+        if self.current is None:  # if settings have not been loaded
+            self.load()
+        return self.current
+
+    def build(self):
+        '''Validate settings, print warnings once and precompute Verible arguments'''
+        windows_subsystem_for_linux = self.windows_subsystem_for_linux()
+        format_flags = (
+            f"--assignment_statement_alignment={self.assignment_statement_alignment()}",
+            f"--case_items_alignment={self.case_items_alignment()}",
+            f"--class_member_variables_alignment={self.class_member_variables_alignment()}",
+            f"--formal_parameters_alignment={self.formal_parameters_alignment()}",
+            f"--formal_parameters_indentation={self.formal_parameters_indentation()}",
+            f"--named_parameter_alignment={self.named_parameter_alignment()}",
+            f"--named_parameter_indentation={self.named_parameter_indentation()}",
+            f"--named_port_alignment={self.named_port_alignment()}",
+            f"--named_port_indentation={self.named_port_indentation()}",
+            f"--net_variable_alignment={self.net_variable_alignment()}",
+            f"--port_declarations_alignment={self.port_declarations_alignment()}",
+            f"--port_declarations_indentation={self.port_declarations_indentation()}",
+            f"--struct_union_members_alignment={self.struct_union_members_alignment()}",
+            f"--try_wrap_long_lines={self.try_wrap_long_lines()}",
+            f"--expand_coverpoints={self.expand_coverpoints()}",
+        )  # pass settings
+        prefix = ('wsl',) if windows_subsystem_for_linux else ()  # run the Verible under WSL when requested
+        format_process = prefix + ('verible-verilog-format',) + format_flags + ('-',)  # use Verible Formatter
+        return HDL_Automation_snapshot(
+            windows_subsystem_for_linux=windows_subsystem_for_linux,
+            windows_subsystem_for_linux_warm_up=self.windows_subsystem_for_linux_warm_up(),
+            language_server=self.language_server(),
+            format_on_save=self.format_on_save(),
+            partial_format=self.partial_format(),
+            scope_scanner=self.scope_scanner(),
+            scope_status=self.scope_status(),
+            lint=self.lint(),
+            lint_delay=self.lint_delay(),
+            slow_command_threshold=self.slow_command_threshold(),
+            syntax_tree_cache_size=self.syntax_tree_cache_size() * 1024 * 1024,
+            syntax_tree_size_limit=self.syntax_tree_size_limit() * 1024 * 1024,
+            memory_budget=self.memory_budget() * 1024 * 1024,
+            time_budget=self.time_budget(),
+            format_flags=format_flags,
+            format_process=format_process,
+            syntax_process=prefix + ('verible-verilog-syntax', '--printtree', '-'),  # use Parser
+            index_process=prefix + ('verible-verilog-syntax', '--export_json', '--printtree'),  # use Parser
+            language_server_process=prefix + ('verible-verilog-ls',) + format_flags,  # use Language Server
+            # use Linter reporting findings and syntax errors without failing
+            lint_process=prefix + ('verible-verilog-lint', '--lint_fatal=false', '--parse_fatal=false', '-'),
+            fingerprint=hashlib.sha1(json.dumps(format_process).encode()).hexdigest(),
+        )
 
     def assignment_statement_alignment(self):
         '''Format various assignments
@@ -466,5 +1073,2726 @@ class HDL_Automation_settings:
         print('HDL_Automation: `windows_subsystem_for_linux` changed to default value `True`')
         return True  # otherwise return default setting
 
+    def windows_subsystem_for_linux_warm_up(self):
+        '''Start Windows Subsystem for Linux in background when Verilog or SystemVerilog file is activated after it
+        has been idle, so the first command does not wait for its startup
+        Possible values: {true, false}
+        Default value: false'''
+        setting = self.settings.get("windows_subsystem_for_linux_warm_up")  # get setting
+        if type(setting) == str:  # check if setting is a string
+            setting = setting.strip()  # remove leading and trailing whitespaces
+            setting = setting.lower()  # convert to lowercase
+            if setting == 'false':  # check if setting is correct
+                return False  # return correct setting
+            if setting == 'true':  # check if setting is correct
+                return True  # return correct setting
+        print('HDL_Automation: `windows_subsystem_for_linux_warm_up` changed to default value `False`')
+        return False  # otherwise return default setting
+
+    def language_server(self):
+        '''Serve Format and Scope Name from a long-lived Verible Language Server instead of a process per command
+        Possible values: {true, false}
+        Default value: false'''
+        setting = self.settings.get("language_server")  # get setting
+        if type(setting) == str:  # check if setting is a string
+            setting = setting.strip()  # remove leading and trailing whitespaces
+            setting = setting.lower()  # convert to lowercase
+            if setting == 'false':  # check if setting is correct
+                return False  # return correct setting
+            if setting == 'true':  # check if setting is correct
+                return True  # return correct setting
+        print('HDL_Automation: `language_server` changed to default value `False`')
+        return False  # otherwise return default setting
+
+    def format_on_save(self):
+        '''Format Verilog and SystemVerilog files when they are saved
+        Possible values: {true, false}
+        Default value: false'''
+        setting = self.settings.get("format_on_save")  # get setting
+        if type(setting) == str:  # check if setting is a string
+            setting = setting.strip()  # remove leading and trailing whitespaces
+            setting = setting.lower()  # convert to lowercase
+            if setting == 'false':  # check if setting is correct
+                return False  # return correct setting
+            if setting == 'true':  # check if setting is correct
+                return True  # return correct setting
+        print('HDL_Automation: `format_on_save` changed to default value `False`')
+        return False  # otherwise return default setting
+
+    def syntax_tree_cache_size(self):
+        '''Maximal memory in megabytes used to remember syntax trees of inspected files, 0 disables the cache
+        Possible values: non-negative integer
+        Default value: 64'''
+        setting = self.settings.get("syntax_tree_cache_size")  # get setting
+        if type(setting) == int and setting >= 0:  # check if setting is correct
+            return setting  # return correct setting
+        print('HDL_Automation: `syntax_tree_cache_size` changed to default value `64`')
+        return 64  # otherwise return default setting
+
+    def syntax_tree_size_limit(self):
+        '''File size in megabytes above which files are neither parsed, linted nor indexed by Verible, Scope Name is
+        answered by built-in tokenizer alone and Partial Format formats only edited lines with `--lines`,
+        0 disables the limit
+        Possible values: non-negative integer
+        Default value: 32'''
+        setting = self.settings.get("syntax_tree_size_limit")  # get setting
+        if type(setting) == int and setting >= 0:  # check if setting is correct
+            return setting  # return correct setting
+        print('HDL_Automation: `syntax_tree_size_limit` changed to default value `32`')
+        return 32  # otherwise return default setting
+
+    def memory_budget(self):
+        '''Maximal memory in megabytes a command may hold, commands needing more are skipped and Verible output
+        growing beyond it stops the command, module index and Format Files share it between parallel workers,
+        0 disables the budget
+        Possible values: non-negative integer
+        Default value: 1024'''
+        setting = self.settings.get("memory_budget")  # get setting
+        if type(setting) == int and setting >= 0:  # check if setting is correct
+            return setting  # return correct setting
+        print('HDL_Automation: `memory_budget` changed to default value `1024`')
+        return 1024  # otherwise return default setting
+
+    def time_budget(self):
+        '''Time in seconds after which background requests are stopped together with their Verible process,
+        0 disables the budget
+        Possible values: non-negative integer
+        Default value: 120'''
+        setting = self.settings.get("time_budget")  # get setting
+        if type(setting) == int and setting >= 0:  # check if setting is correct
+            return setting  # return correct setting
+        print('HDL_Automation: `time_budget` changed to default value `120`')
+        return 120  # otherwise return default setting
+
+    def partial_format(self):
+        '''Format only modules, classes, functions and other top level constructs containing selections or lines
+        edited since last format, instead of whole file, only whole top level constructs are formatted, so an edit
+        inside a large module formats the whole module, Verible cannot format nested blocks on their own
+        Possible values: {true, false}
+        Default value: false'''
+        setting = self.settings.get("partial_format")  # get setting
+        if type(setting) == str:  # check if setting is a string
+            setting = setting.strip()  # remove leading and trailing whitespaces
+            setting = setting.lower()  # convert to lowercase
+            if setting == 'false':  # check if setting is correct
+                return False  # return correct setting
+            if setting == 'true':  # check if setting is correct
+                return True  # return correct setting
+        print('HDL_Automation: `partial_format` changed to default value `False`')
+        return False  # otherwise return default setting
+
+    def scope_scanner(self):
+        '''Answer Scope Name from built-in tokenizer and ask Verible only when preprocessor directives, macros or
+        unbalanced declarations make its answer uncertain
+        Possible values: {true, false}
+        Default value: true'''
+        setting = self.settings.get("scope_scanner")  # get setting
+        if type(setting) == str:  # check if setting is a string
+            setting = setting.strip()  # remove leading and trailing whitespaces
+            setting = setting.lower()  # convert to lowercase
+            if setting == 'false':  # check if setting is correct
+                return False  # return correct setting
+            if setting == 'true':  # check if setting is correct
+                return True  # return correct setting
+        print('HDL_Automation: `scope_scanner` changed to default value `True`')
+        return True  # otherwise return default setting
+
+    def scope_status(self):
+        '''Show modules and instances enclosing first cursor in status bar, Verible is asked again only when edits
+        overlap them
+        Possible values: {true, false}
+        Default value: false'''
+        setting = self.settings.get("scope_status")  # get setting
+        if type(setting) == str:  # check if setting is a string
+            setting = setting.strip()  # remove leading and trailing whitespaces
+            setting = setting.lower()  # convert to lowercase
+            if setting == 'false':  # check if setting is correct
+                return False  # return correct setting
+            if setting == 'true':  # check if setting is correct
+                return True  # return correct setting
+        print('HDL_Automation: `scope_status` changed to default value `False`')
+        return False  # otherwise return default setting
+
+    def lint(self):
+        '''Lint Verilog and SystemVerilog files in background while they are edited
+        Possible values: {true, false}
+        Default value: false'''
+        setting = self.settings.get("lint")  # get setting
+        if type(setting) == str:  # check if setting is a string
+            setting = setting.strip()  # remove leading and trailing whitespaces
+            setting = setting.lower()  # convert to lowercase
+            if setting == 'false':  # check if setting is correct
+                return False  # return correct setting
+            if setting == 'true':  # check if setting is correct
+                return True  # return correct setting
+        print('HDL_Automation: `lint` changed to default value `False`')
+        return False  # otherwise return default setting
+
+    def lint_delay(self):
+        '''Time in milliseconds without edits after which a file is linted
+        Possible values: non-negative integer
+        Default value: 500'''
+        setting = self.settings.get("lint_delay")  # get setting
+        if type(setting) == int and setting >= 0:  # check if setting is correct
+            return setting  # return correct setting
+        print('HDL_Automation: `lint_delay` changed to default value `500`')
+        return 500  # otherwise return default setting
+
+    def slow_command_threshold(self):
+        '''Print phase durations of commands taking at least this many milliseconds to console, 0 disables it
+        Possible values: non-negative integer
+        Default value: 0'''
+        setting = self.settings.get("slow_command_threshold")  # get setting
+        if type(setting) == int and setting >= 0:  # check if setting is correct
+            return setting  # return correct setting
+        print('HDL_Automation: `slow_command_threshold` changed to default value `0`')
+        return 0  # otherwise return default setting
+
+
+class HDL_Automation_policy:
+    '''Choose how commands inspect a file depending on its size and keep them within memory budget'''
+
+    disk_size = 1024 * 1024  # number of characters from which saved content is read from disk
+
+    def strategy(self, view, config):
+        '''Return 'tree' when Verible may parse view, or 'tokens' when only built-in tokenizer may inspect it'''
+        if config.syntax_tree_size_limit and view.size() > config.syntax_tree_size_limit:  # if file is too large
+            return 'tokens'
+        return 'tree'
+
+    def affordable(self, view, config, name, copies):
+        '''Return True if command holding copies of file content fits memory budget, otherwise tell user why not'''
+        needed = view.size() * copies  # estimate peak memory of command
+        if config.memory_budget and needed > config.memory_budget:  # if command would exceed budget
+            size, needed = view.size() // (1024 * 1024), needed // (1024 * 1024)  # convert to megabytes
+            message = f"HDL_Automation: {name} skipped, {size} MB file needs about {needed} MB, above `memory_budget`"
+            print(message)
+            sublime.status_message(message)
+            return False
+        return True
+
+    def content(self, view):
+        '''Return content of view as byte string, large unmodified files are read from disk without decoding'''
+        file_name = view.file_name()  # get current file path
+        saved = file_name is not None and not view.is_dirty()  # True if buffer is saved to file
+        # if saved file holds the same bytes as buffer
+        if view.size() >= self.disk_size and saved and view.encoding() == 'UTF-8' and view.line_endings() == 'Unix':
+            try:  # prevent OSError
+                with open(file_name, 'rb') as file:  # open saved file
+                    content = file.read()  # read bytes once instead of copying text and encoding it
+                if len(content) == view.size():  # if file is plain ASCII and unchanged on disk
+                    return content
+            except OSError:  # if file cannot be read
+                pass
+        return view.substr(sublime.Region(0, view.size())).encode()
+
+
+class HDL_Automation_allowance:
+    '''Memory budget shared by workers processing files in parallel'''
+
+    def __init__(self, budget):
+        '''Create allowance of budget bytes, 0 when unlimited'''
+        self.budget = budget  # maximal memory held by all workers together
+        self.used = 0  # memory held by running workers
+        self.condition = threading.Condition()  # wake up waiting workers when memory is released
+
+    def fits(self, needed):
+        '''Return True if work needing needed bytes fits budget at all'''
+        return not self.budget or needed <= self.budget
+
+    def acquire(self, needed, cancelled=None):
+        '''Wait until needed bytes fit beside memory held by other workers, return False when cancelled first'''
+        with self.condition:  # prevent concurrent update
+            while self.budget and self.used and self.used + needed > self.budget:  # while other workers hold memory
+                if cancelled is not None and cancelled.is_set():  # if work has been cancelled meanwhile
+                    return False
+                self.condition.wait(0.1)
+            self.used += needed
+            return True
+
+    def release(self, needed):
+        '''Return needed bytes to other workers'''
+        with self.condition:  # prevent concurrent update
+            self.used -= needed
+            self.condition.notify_all()
+
+
+class HDL_Automation_syntax_tree_cache:
+    '''Remember syntax trees of recently inspected file contents'''
+
+    def __init__(self):
+        '''Create empty cache'''
+        self.limit = 64 * 1024 * 1024  # maximal size of remembered syntax trees
+        self.size = 0  # current size of remembered syntax trees
+        self.trees = collections.OrderedDict()  # syntax trees and sizes by content hash, least recently used first
+        self.buffers = {}  # change count and content hash by buffer id
+
+    def digest(self, content):
+        '''Return hash of byte string content'''
+        return hashlib.sha1(content).hexdigest()
+
+    def get(self, view):
+        '''Return syntax tree of view if buffer has not changed since last lookup, otherwise None'''
+        change_count, digest = self.buffers.get(view.buffer_id(), (None, None))  # get last known buffer state
+        if change_count != view.change_count():  # if buffer has changed since last lookup
+            return None  # content hash has to be computed
+        return self.lookup(digest)
+
+    def find(self, view, digest):
+        '''Return syntax tree of content hash and bind it to the current state of view'''
+        self.buffers[view.buffer_id()] = (view.change_count(), digest)  # remember current buffer state
+        return self.lookup(digest)
+
+    def lookup(self, digest):
+        '''Return syntax tree of content hash or None'''
+        entry = self.trees.get(digest)  # get syntax tree and its size
+        if entry is None:  # if content has not been parsed or syntax tree was evicted
+            return None
+        self.trees.move_to_end(digest)  # mark syntax tree as most recently used
+        return entry[0]
+
+    def put(self, view, digest, tree, size):
+        '''Remember syntax tree of content hash bound to the current state of view'''
+        self.buffers[view.buffer_id()] = (view.change_count(), digest)  # remember current buffer state
+        if digest in self.trees:  # if content has been parsed before
+            self.size -= self.trees.pop(digest)[1]  # forget previous syntax tree
+        self.trees[digest] = (tree, size)  # remember syntax tree as most recently used
+        self.size += size  # update size of remembered syntax trees
+        self.evict()
+
+    def resize(self, limit):
+        '''Change memory cap, 0 disables the cache'''
+        self.limit = limit
+        self.evict()
+
+    def evict(self):
+        '''Forget least recently used syntax trees until memory cap is met'''
+        while self.size > self.limit and self.trees:  # while memory cap is exceeded
+            evicted_tree, evicted_size = self.trees.popitem(last=False)[1]  # forget least recently used syntax tree
+            self.size -= evicted_size  # update size of remembered syntax trees
+
+    def discard(self, buffer_id):
+        '''Forget state of closed buffer'''
+        self.buffers.pop(buffer_id, None)
+
+
+class HDL_Automation_scope_tree:
+    '''Interval index of modules and instances found in Verible syntax tree'''
+
+    # syntax tree nodes which are indexed
+    tags = [
+        'kModuleDeclaration',
+        'kInstantiationBase',
+        'kGateInstance',
+        'kInterfaceDeclaration',
+        'kPackageDeclaration',
+        'kClassDeclaration',
+        'kSymbol',  # document symbol reported by language server
+    ]
+    keywords = {
+        'kModuleDeclaration': 'module',
+        'kInterfaceDeclaration': 'interface',
+        'kPackageDeclaration': 'package',
+        'kClassDeclaration': 'class',
+    }  # keyword shown before name of declaration
+    symbol_kinds = {
+        2: 'kModuleDeclaration',
+        4: 'kPackageDeclaration',
+        5: 'kClassDeclaration',
+        11: 'kInterfaceDeclaration',
+    }  # tag of each Language Server Protocol symbol kind
+
+    def __init__(self):
+        '''Create empty index'''
+        self.starts = array.array('q')  # starting offset of each node, nodes are ordered by starting offset
+        self.ends = array.array('q')  # ending offset of each node
+        self.parents = array.array('q')  # index of enclosing node or -1
+        self.kinds = array.array('b')  # position of node tag in tags list
+        self.names = []  # first identifier of each node
+        self.top_starts = array.array('q')  # starting offset of each top level construct, in order
+        self.top_ends = array.array('q')  # ending offset of each top level construct
+        self.top_start = None  # starting offset of open top level construct, -1 before its first leaf
+        self.opened = []  # index of each currently open syntax tree node or -1 when node is not indexed
+        self.enclosing = []  # indexes of currently open indexed nodes
+        self.unstarted = []  # indexes of open nodes waiting for their first leaf
+        self.unnamed = []  # indexes of open nodes waiting for their first identifier
+        self.last_end = 0  # ending offset of last leaf
+
+    node_line = re.compile(rb' *Node @\d+ \(tag: (\w+)\) \{')  # node printed by `--printtree`
+    leaf_line = re.compile(rb' *Leaf @\d+ \(#(.*?) @(\d+)-(\d+): ')  # leaf with tag and byte offsets
+    close_line = re.compile(rb' *\}\s*$')  # end of node
+
+    @classmethod
+    def from_printtree(cls, lines, content):
+        '''Index syntax tree printed by `verible-verilog-syntax --printtree` while its lines arrive'''
+        tree = cls()  # create empty index
+        if not cls.read(lines, tree):  # if output has no syntax tree
+            raise ValueError('missing syntax tree')
+        tree.finish(content)
+        return tree
+
+    @classmethod
+    def read(cls, lines, visitor):
+        '''Pass nodes and leaves of printed syntax tree to open, leaf and close methods of visitor in document order,
+        return number of nodes'''
+        tags = {}  # decoded tag of each byte string tag
+        nodes = 0
+        for line in lines:  # for each output line
+            match = cls.leaf_line.match(line)
+            if match:  # if line is a leaf
+                tag = tags.get(match.group(1)) or tags.setdefault(match.group(1), match.group(1).decode('utf-8'))
+                visitor.leaf(tag, int(match.group(2)), int(match.group(3)))
+                continue
+            match = cls.node_line.match(line)
+            if match:  # if line opens a node
+                tag = tags.get(match.group(1)) or tags.setdefault(match.group(1), match.group(1).decode('utf-8'))
+                visitor.open(tag)
+                nodes += 1
+            elif nodes and cls.close_line.match(line):  # if line closes a node
+                visitor.close()
+        return nodes
+
+    @staticmethod
+    def walk(root, visitor):
+        '''Pass nodes and leaves of JSON syntax tree to open, leaf and close methods of visitor in document order'''
+        visitor.open(root['tag'])  # enter root node
+        children = [iter(root.get('children') or ())]  # iterators over children of each open node
+        while children:  # while any node is open
+            for child in children[-1]:  # for each remaining child of innermost open node
+                if child is None:  # if child is an omitted optional node
+                    continue
+                if 'children' in child:  # if child is a node
+                    visitor.open(child['tag'])  # enter node
+                    children.append(iter(child['children'] or ()))  # iterate over its children next
+                    break
+                visitor.leaf(child['tag'], child['start'], child['end'])  # otherwise child is a leaf
+            else:  # if all children has been visited
+                del children[-1]  # leave node
+                visitor.close()
+
+    @staticmethod
+    def characters(content, offsets):
+        '''Return character offset of each byte offset of content'''
+        if content.isascii():  # if byte offsets are character offsets
+            return {offset: offset for offset in offsets}
+        characters = {}  # character offset of each byte offset
+        count = 0  # number of characters before current byte offset
+        previous = 0  # previous byte offset
+        for offset in sorted(set(offsets)):  # for each byte offset in ascending order
+            count += len(content[previous:offset].decode('utf-8', 'replace'))  # count characters between
+            characters[offset] = count
+            previous = offset
+        return characters
+
+    @classmethod
+    def from_symbols(cls, symbols, text):
+        '''Index document symbols reported by language server for text'''
+        line_starts = HDL_Automation_language_server.line_starts(text)  # get offset of each line
+        nodes = []  # character offsets, tag and name of each symbol
+        pending = list(symbols or ())  # symbols waiting to be visited
+        while pending:  # while any symbol is not visited
+            symbol = pending.pop()
+            if 'range' in symbol:  # if symbol is a DocumentSymbol
+                symbol_range = symbol['range']
+            else:  # if symbol is a SymbolInformation
+                symbol_range = symbol['location']['range']
+            nodes.append((
+                HDL_Automation_language_server.offset(text, line_starts, symbol_range['start']),
+                HDL_Automation_language_server.offset(text, line_starts, symbol_range['end']),
+                cls.symbol_kinds.get(symbol.get('kind'), 'kSymbol'),
+                symbol.get('name')
+            ))
+            pending.extend(symbol.get('children') or ())  # visit nested symbols
+        nodes.sort(key=lambda node: (node[0], -node[1]))  # order symbols by starting offset, outermost first
+        tree = cls()  # create empty index
+        for start, end, tag, name in nodes:  # for each symbol
+            while tree.enclosing and tree.ends[tree.enclosing[-1]] < end:  # while symbol is outside enclosing symbol
+                tree.enclosing.pop()
+            tree.starts.append(start)
+            tree.ends.append(end)
+            tree.parents.append(tree.enclosing[-1] if tree.enclosing else -1)  # link symbol with enclosing symbol
+            tree.kinds.append(cls.tags.index(tag))
+            tree.names.append(name)
+            if not tree.enclosing and tag != 'kSymbol':  # if symbol is a top level declaration
+                tree.top_starts.append(start)
+                tree.top_ends.append(end)
+            tree.enclosing.append(len(tree.starts) - 1)
+        tree.opened = tree.enclosing = tree.unstarted = tree.unnamed = None  # release build state
+        return tree
+
+    def open(self, tag):
+        '''Enter syntax tree node'''
+        if tag in self.tags:  # if node is indexed
+            index = len(self.starts)  # get index of new node
+            self.starts.append(-1)  # starting offset is known from first leaf
+            self.ends.append(-1)  # ending offset is known from last leaf
+            self.parents.append(self.enclosing[-1] if self.enclosing else -1)  # link node with enclosing node
+            self.kinds.append(self.tags.index(tag))
+            self.names.append(None)  # identifier is known from first identifier leaf
+            self.enclosing.append(index)
+            self.unstarted.append(index)
+            self.unnamed.append(index)
+            self.opened.append(index)
+        else:  # if node is not indexed
+            self.opened.append(-1)
+        if len(self.opened) == 2:  # if node is a top level construct
+            self.top_start = -1  # starting offset is known from first leaf
+
+    def leaf(self, tag, start, end):
+        '''Visit syntax tree leaf'''
+        for index in self.unstarted:  # for each open node without leaves
+            self.starts[index] = start  # node starts with this leaf
+        self.unstarted.clear()
+        if self.top_start == -1:  # if top level construct has no leaves yet
+            self.top_start = start  # construct starts with this leaf
+        if tag == 'SymbolIdentifier':  # if leaf is an identifier
+            for index in self.unnamed:  # for each open node without identifier
+                self.names[index] = (start, end)  # node is named by this leaf
+            self.unnamed.clear()
+        self.last_end = end
+
+    def close(self):
+        '''Leave syntax tree node'''
+        index = self.opened.pop()  # get index of left node
+        if index >= 0:  # if node is indexed
+            if self.unstarted and self.unstarted[-1] == index:  # if node has no leaves
+                self.unstarted.pop()
+                self.starts[index] = self.last_end  # node is empty
+            if self.unnamed and self.unnamed[-1] == index:  # if node has no identifier
+                self.unnamed.pop()
+            self.ends[index] = self.last_end  # node ends with last leaf
+            self.enclosing.pop()
+        if len(self.opened) == 1 and self.top_start is not None:  # if top level construct ends
+            if self.top_start >= 0:  # if construct has any leaves
+                self.top_starts.append(self.top_start)
+                self.top_ends.append(self.last_end)  # construct ends with last leaf
+            self.top_start = None
+
+    def finish(self, content):
+        '''Convert byte offsets of content to character offsets and resolve identifiers'''
+        for index, name in enumerate(self.names):  # for each node
+            if name is not None:  # if node has identifier
+                self.names[index] = content[name[0]:name[1]].decode('utf-8')  # get identifier text
+        if not content.isascii():  # if byte offsets differ from character offsets
+            # convert offsets
+            offsets = self.characters(content, [*self.starts, *self.ends, *self.top_starts, *self.top_ends])
+            self.starts = array.array('q', [offsets[offset] for offset in self.starts])
+            self.ends = array.array('q', [offsets[offset] for offset in self.ends])
+            self.top_starts = array.array('q', [offsets[offset] for offset in self.top_starts])
+            self.top_ends = array.array('q', [offsets[offset] for offset in self.top_ends])
+        self.opened = self.enclosing = self.unstarted = self.unnamed = None  # release build state
+
+    def size(self):
+        '''Return approximate memory used by index in bytes'''
+        size = 8 * 4 * len(self.starts) + 8 * 2 * len(self.top_starts)  # offsets, links, tags and name references
+        for name in self.names:  # for each identifier
+            if name is not None:  # if node has identifier
+                size += 50 + len(name)  # string object with its text
+        return size
+
+    def chain(self, offset):
+        '''Return indexes of nodes enclosing character offset, from outermost to innermost'''
+        chain = []
+        index = bisect.bisect_right(self.starts, offset) - 1  # get last node starting before offset
+        while index >= 0:  # while node exists
+            if self.ends[index] >= offset:  # if node encloses offset
+                chain.append(index)
+            index = self.parents[index]  # check enclosing node
+        chain.reverse()
+        return chain
+
+    def constructs(self, regions):
+        '''Return sorted indexes of top level constructs intersecting any of character regions'''
+        indexes = set()
+        for begin, end in regions:  # for each region as starting and ending offset
+            first = bisect.bisect_left(self.top_ends, begin)  # get first construct ending inside or after region
+            last = bisect.bisect_right(self.top_starts, end)  # get first construct starting after region
+            indexes.update(range(first, last))
+        return sorted(indexes)
+
+    def html(self, chain):
+        '''Describe chain of nodes as popup content'''
+        content = ''
+        for key, index in enumerate(chain):  # for each node from outermost to innermost
+            tag = self.tags[self.kinds[index]]  # get node tag
+            name = self.names[index]  # get node identifier
+            if name is None:  # if node has no identifier
+                continue
+            if tag in self.keywords:  # if node is a declaration
+                content += f"<div>"
+                content += f"<span style='color:var(--redish)'>"
+                content += f"{self.keywords[tag]}"
+                content += f"</span>"
+                content += f" "
+                content += f"<span style='color:var(--bluish)'>"
+                content += f"{name}"
+                content += f"</span>"
+                content += f"</div>"
+            if tag == 'kInstantiationBase':  # if node is an instantiation
+                content += f"<div>"
+                content += f"<span style='color:var(--bluish)'>"
+                content += f"{name}"
+                content += f"</span>"
+                for inner in chain[key + 1:]:  # for each node inside instantiation
+                    if self.tags[self.kinds[inner]] == 'kGateInstance' and self.names[inner] is not None:
+                        content += f" "
+                        content += f"<span style='color:var(--bluish)'>"
+                        content += f"{self.names[inner]}"  # show instance name
+                        content += f"</span>"
+                        break
+                content += f"</div>"
+            if tag == 'kSymbol':  # if node is another document symbol
+                content += f"<div>"
+                content += f"<span style='color:var(--bluish)'>"
+                content += f"{name}"
+                content += f"</span>"
+                content += f"</div>"
+        return content
+
+    def text(self, chain):
+        '''Describe chain of nodes as a single status bar line'''
+        parts = []
+        for key, index in enumerate(chain):  # for each node from outermost to innermost
+            tag = self.tags[self.kinds[index]]  # get node tag
+            name = self.names[index]  # get node identifier
+            if name is None:  # if node has no identifier
+                continue
+            if tag in self.keywords:  # if node is a declaration
+                parts.append(f"{self.keywords[tag]} {name}")
+            if tag == 'kInstantiationBase':  # if node is an instantiation
+                for inner in chain[key + 1:]:  # for each node inside instantiation
+                    if self.tags[self.kinds[inner]] == 'kGateInstance' and self.names[inner] is not None:
+                        name += f" {self.names[inner]}"  # show instance name
+                        break
+                parts.append(name)
+            if tag == 'kSymbol':  # if node is another document symbol
+                parts.append(name)
+        return ' / '.join(parts)
+
+
+class HDL_Automation_scope_checkpoints:
+    '''Scanner state of one buffer'''
+
+    def __init__(self, interval):
+        '''Create state of unscanned buffer with checkpoints at least interval characters apart'''
+        self.interval = interval  # minimal number of characters between checkpoints
+        self.offsets = []  # character offset of each checkpoint, in order
+        self.stacks = []  # tuples of scopes open at each checkpoint
+        self.markers = []  # offsets of preprocessor directives and macros which may change scopes
+        self.errors = []  # offsets of unmatched end keywords
+        self.scanned = 0  # offset up to which checkpoints, markers and errors are known
+        self.change_count = 0  # change count of buffer when state was valid
+
+    def invalidate(self, offset):
+        '''Forget everything scanned after checkpoint before character offset'''
+        count = bisect.bisect_right(self.offsets, offset)  # get number of checkpoints before edit
+        del self.offsets[count:]
+        del self.stacks[count:]
+        self.scanned = min(self.scanned, self.offsets[-1] if self.offsets else 0)  # scan again from checkpoint
+        del self.markers[bisect.bisect_left(self.markers, self.scanned):]
+        del self.errors[bisect.bisect_left(self.errors, self.scanned):]
+
+
+class HDL_Automation_scope_scanner:
+    '''Find modules and instances enclosing offsets by tokenizing buffer without Verible'''
+
+    interval = 512  # minimal number of characters between checkpoints
+    checkpoints = 65536  # number of checkpoints of large files, their interval grows with file size
+    margin = 1024  # number of characters read after last offset to complete its token
+    window = 256 * 1024  # maximal number of characters scanned at once, so large files are scanned in slices
+
+    # token after optional whitespace, comments, strings, macro definitions and numbers are skipped
+    token = re.compile(r'''\s*(?:
+        (?P<skip>//[^\n]*|/\*.*?(?:\*/|\Z)|"(?:\\.|[^"\\\n])*"?|`define\b(?:\\\r?\n|[^\n])*
+            |\d[\w.]*|'[sS]?[bBoOdDhH][\w?]*)
+        |(?P<directive>`\w+)
+        |(?P<identifier>[A-Za-z_][\w$]*|\\\S+)
+        |(?P<symbol>::|\S)
+    )''', re.S | re.X)
+    # token inside brackets where everything except brackets and directives is skipped
+    inner = re.compile(r'''\s*(?:
+        (?P<skip>//[^\n]*|/\*.*?(?:\*/|\Z)|"(?:\\.|[^"\\\n])*"?|`define\b(?:\\\r?\n|[^\n])*
+            |\\\S+|[^()\[\]{}"/`\\]+|/)
+        |(?P<directive>`\w+)
+        |(?P<symbol>\S)
+    )''', re.S | re.X)
+    tags = {tag: index for index, tag in enumerate(HDL_Automation_scope_tree.tags)}  # position of each tag
+    openers = {
+        'module': 'kModuleDeclaration',
+        'macromodule': 'kModuleDeclaration',
+        'interface': 'kInterfaceDeclaration',
+        'package': 'kPackageDeclaration',
+        'class': 'kClassDeclaration',
+    }  # tag of declaration started by each keyword
+    closers = {
+        'endmodule': 'kModuleDeclaration',
+        'endinterface': 'kInterfaceDeclaration',
+        'endpackage': 'kPackageDeclaration',
+        'endclass': 'kClassDeclaration',
+    }  # tag of declaration ended by each keyword
+    references = {('typedef', 'class'), ('virtual', 'interface')}  # keyword pairs not starting declaration
+    conditionals = {'`ifdef', '`ifndef', '`elsif', '`else', '`endif', '`include'}  # directives which may hide scopes
+    directives = {
+        '`timescale', '`default_nettype', '`resetall', '`celldefine', '`endcelldefine', '`undef', '`undefineall',
+        '`line', '`pragma', '`begin_keywords', '`end_keywords', '`unconnected_drive', '`nounconnected_drive',
+        '`__FILE__', '`__LINE__',
+    }  # directives which never change scopes
+    blocks = {
+        'begin', 'end', 'generate', 'endgenerate', 'else', 'fork', 'join', 'join_any', 'join_none', 'endcase',
+        'endfunction', 'endtask', 'endprogram', 'endchecker', 'endgroup', 'endproperty', 'endsequence', 'endclocking',
+        'endconfig', 'endprimitive', 'endspecify', 'endtable',
+    }  # keywords after which new statement starts
+    keywords = frozenset('''
+        accept_on alias always always_comb always_ff always_latch and assert assign assume automatic before begin bind
+        bins binsof bit break buf bufif0 bufif1 byte case casex casez cell chandle checker class clocking cmos config
+        const constraint context continue cover covergroup coverpoint cross deassign default defparam design disable
+        dist do edge else end endcase endchecker endclass endclocking endconfig endfunction endgenerate endgroup
+        endinterface endmodule endpackage endprimitive endprogram endproperty endspecify endsequence endtable endtask
+        enum event eventually expect export extends extern final first_match for force foreach forever fork forkjoin
+        function generate genvar global highz0 highz1 if iff ifnone ignore_bins illegal_bins implements implies import
+        incdir include initial inout input inside instance int integer interconnect interface intersect join join_any
+        join_none large let liblist library local localparam logic longint macromodule matches medium modport module
+        nand negedge nettype new nexttime nmos nor noshowcancelled not notif0 notif1 null or output package packed
+        parameter pmos posedge primitive priority program property protected pull0 pull1 pulldown pullup
+        pulsestyle_ondetect pulsestyle_onevent pure rand randc randcase randsequence rcmos real realtime ref reg
+        reject_on release repeat restrict return rnmos rpmos rtran rtranif0 rtranif1 s_always s_eventually s_nexttime
+        s_until s_until_with scalared sequence shortint shortreal showcancelled signed small soft solve specify
+        specparam static string strong strong0 strong1 struct super supply0 supply1 sync_accept_on sync_reject_on
+        table tagged task this throughout time timeprecision timeunit tran tranif0 tranif1 tri tri0 tri1 triand trior
+        trireg type typedef union unique unique0 unsigned until until_with untyped use uwire var vectored virtual void
+        wait wait_order wand weak weak0 weak1 while wildcard wire with within wor xnor xor
+    '''.split())  # reserved words of IEEE 1800 which cannot name a module or an instance
+
+    def __init__(self):
+        '''Create scanner without any scanned buffer'''
+        self.states = {}  # HDL_Automation_scope_checkpoints by buffer id
+
+    def changed(self, buffer_id, changes):
+        '''Forget checkpoints after first change of buffer'''
+        state = self.states.get(buffer_id)
+        if state is not None and changes:  # if buffer has been scanned
+            state.invalidate(min(change.a.pt for change in changes))  # scan again from checkpoint before edit
+            state.change_count = None  # checkpoints are valid for next change count
+
+    def discard(self, buffer_id):
+        '''Forget closed buffer'''
+        self.states.pop(buffer_id, None)
+
+    @classmethod
+    def instance(cls, statement):
+        '''Return type and name tokens when statement tokens so far form instantiation header, otherwise None'''
+        end = len(statement)
+        while end and statement[end - 1][0] == '[]':  # while statement ends with instance array range
+            end -= 1
+        if end < 2:  # if there is no room for type and name
+            return None
+        name = statement[end - 1]  # instance name is directly before port list
+        end -= 1
+        if end >= 3 and statement[end - 1][0] == '()' and statement[end - 2][0] == '#':  # if parameters are set
+            end -= 2
+        kind = statement[end - 1]  # instantiated module name is before parameters
+        prefix = statement[:end - 1]  # tokens before instantiated module name
+        if not cls.identifier(kind[0]) or not cls.identifier(name[0]):  # if type or name is not an identifier
+            return None
+        if prefix and prefix[-1][0] != ':' and (prefix[-1][0] != '()' or prefix[0][0] not in ('if', 'for', 'case')):
+            return None  # tokens before type are not a label or generate condition
+        return kind, name
+
+    @classmethod
+    def identifier(cls, word):
+        '''Returns True if token is an identifier which is not a keyword'''
+        return (word[0].isalpha() or word[0] in '_\\') and word not in cls.keywords
+
+    @staticmethod
+    def chain(offset, stack, closed):
+        '''Return offset with scopes enclosing it, scopes closed by last tokens enclose offsets inside the tokens'''
+        for end, scopes in closed:  # for each closing token from first
+            if offset <= end:  # if offset is inside token
+                return offset, list(scopes)
+        return offset, list(stack)  # scopes are shared so names found later are seen
+
+    def scan(self, view, offsets):
+        '''Return scope tree enclosing character offsets and whether Verible has to confirm it'''
+        buffer_id = view.buffer_id()  # get buffer of view
+        state = self.states.get(buffer_id)
+        if state is None or state.change_count not in (None, view.change_count()):  # if state is unknown or stale
+            interval = max(self.interval, view.size() // self.checkpoints)  # bound memory of checkpoints
+            state = self.states[buffer_id] = HDL_Automation_scope_checkpoints(interval)
+        state.change_count = view.change_count()  # state is updated to current content
+        offsets = sorted(set(offsets))  # scan through each offset once
+        chains = []  # (offset, scopes) of each offset
+        run = offsets[:1]  # offsets scanned without restarting
+        for offset in offsets[1:]:  # for each further offset
+            index = bisect.bisect_left(state.offsets, offset) - 1  # get last checkpoint before offset
+            if index >= 0 and state.offsets[index] > run[-1]:  # if scanning can restart closer to offset
+                chains.append(self.walk(view, state, run))
+                run = []
+            run.append(offset)
+        chains.append(self.walk(view, state, run))
+        if None in chains:  # if window has ended before an offset
+            return None, True  # scanning continues from last checkpoint next time
+        chains = [chain for run in chains for chain in run]  # join offsets of all runs
+
+        tree = HDL_Automation_scope_tree()  # collect enclosing scopes
+        indexes = {}  # index of each scope by starting offset and tag
+        ambiguous = False  # True if any offset needs Verible
+        for offset, chain in chains:  # for each offset with its enclosing scopes
+            parent = -1
+            for scope_start, tag, name in chain:  # for each scope from outermost to innermost
+                index = indexes.get((scope_start, tag))
+                if index is None:  # if scope encloses no earlier offset
+                    index = indexes[scope_start, tag] = len(tree.starts)
+                    tree.starts.append(scope_start)
+                    tree.ends.append(offset)
+                    tree.parents.append(parent)
+                    tree.kinds.append(tag)
+                    tree.names.append(name)
+                tree.ends[index] = max(tree.ends[index], offset)  # scope encloses offset
+                parent = index
+                ambiguous = ambiguous or name is None  # declaration without name may be a macro
+            first = chain[0][0] if chain else 0  # get start of outermost scope
+            if bisect.bisect_left(state.markers, offset) > bisect.bisect_left(state.markers, first):
+                ambiguous = True  # directives inside scope may change it
+            if bisect.bisect_left(state.errors, offset):  # if scopes before offset are unbalanced
+                ambiguous = True
+        tree.opened = tree.enclosing = tree.unstarted = tree.unnamed = None  # release build state
+        return tree, ambiguous
+
+    def progress(self, view):
+        '''Return percentage of view scanned so far'''
+        state = self.states.get(view.buffer_id())
+        if state is None or not view.size():  # if view has not been scanned
+            return 0
+        return min(100, 100 * state.scanned // view.size())
+
+    def walk(self, view, state, offsets):
+        '''Return (offset, scopes) of sorted offsets, scanning from last checkpoint before first offset, or None
+        when window has ended before last offset'''
+        index = bisect.bisect_left(state.offsets, offsets[0]) - 1  # get last checkpoint before first offset
+        start = state.offsets[index] if index >= 0 else 0  # start scanning from checkpoint
+        stack = [list(scope) for scope in state.stacks[index]] if index >= 0 else []  # scopes open at checkpoint
+        end = min(view.size(), offsets[-1] + self.margin)  # read enough to complete token at last offset
+        sliced = end - start > self.window  # True if offsets are too far for a single scan
+        text = view.substr(sublime.Region(start, start + self.window if sliced else end))  # get text after checkpoint
+
+        chains = []  # (offset, scopes) of each offset
+        statement = []  # (text, offset) tokens of current statement outside brackets
+        depth = 0  # number of open brackets
+        base = None  # scope of instantiation until its semicolon
+        gate = None  # scope of instance until end of its port list
+        unnamed = None  # declaration waiting for its identifier
+        previous = None  # previous identifier directly before token
+        labelled = False  # True if block keyword may be followed by label
+        label = False  # True if next identifier is a block label
+        ignored = False  # True if next identifier is a directive argument
+        closed = []  # (ending offset, scopes open before it) of last closing tokens without space between
+        closed_end = -1  # ending offset of last token
+        waiting = []  # chains of offsets inside statement which may turn out to be instantiation header
+        parameters = False  # True inside parameter list of statement
+        pending = 0  # index of next offset to resolve
+        index = 0  # index of next token in text
+        while True:  # for each token
+            match = (self.inner if depth else self.token).match(text, index)  # skip insides of brackets quickly
+            if match is None:  # if text has no more tokens
+                break
+            if sliced and match.end() == len(text):  # if token may continue after window
+                stop = start + match.start()  # get offset up to which window has been scanned
+                following = bisect.bisect_right(state.offsets, start)  # get index of first checkpoint after start
+                if following < len(state.offsets) and state.offsets[following] <= stop:  # if next scan can go on
+                    state.scanned = max(state.scanned, stop)  # markers and errors before stop are known
+                    return None
+                sliced = False  # window has no statement end, read everything at once
+                text = view.substr(sublime.Region(start, end))
+                continue
+            index = match.end()
+            group = match.lastgroup  # get token kind
+            if group == 'skip':  # if token never affects scopes
+                continue
+            position = start + match.start(group)  # get offset of token
+            while pending < len(offsets) and position > offsets[pending]:  # if token starts after offset
+                chains.append(self.chain(offsets[pending], stack, closed))  # get scopes at offset
+                if statement and gate is None and (depth == 0 or parameters):  # if offset may be inside header
+                    waiting.append(chains[-1])
+                pending += 1
+            if pending == len(offsets) and not waiting and unnamed is None:  # if all offsets are resolved
+                break
+            record = state.scanned <= position < offsets[-1]  # remember markers and checkpoints once
+            word = match.group(group)  # get token text
+            adjacent = closed if position == closed_end else []  # scopes closed by directly preceding tokens
+            closed = []  # token has not closed any scope yet
+            closed_end = position + len(word)
+
+            if group == 'directive':  # if token is a compiler directive or macro
+                if word in self.conditionals:  # if directive may hide scopes
+                    ignored = depth == 0 and word in ('`ifdef', '`ifndef', '`elsif')  # skip macro name
+                    if record:
+                        state.markers.append(position)
+                elif word not in self.directives and depth == 0:  # if macro may expand to scopes
+                    statement.append((word, position))
+                    if record:
+                        state.markers.append(position)
+                previous = None
+                continue
+
+            if group == 'identifier':  # if token is a keyword or identifier
+                if ignored or label:  # if identifier does not belong to statement
+                    ignored = label = labelled = False
+                    continue
+                labelled = False
+                if unnamed is not None and depth == 0:  # if declaration waits for its name
+                    if word == 'class' and unnamed[1] == self.tags['kInterfaceDeclaration']:  # if interface class
+                        unnamed[1] = self.tags['kClassDeclaration']
+                    elif word not in self.keywords:  # if identifier names declaration
+                        unnamed[2] = word
+                        unnamed = None
+                elif word in self.openers and depth == 0:  # if keyword may start declaration
+                    if previous != 'extern' and (previous, word) not in self.references:  # if keyword has body
+                        unnamed = [position, self.tags[self.openers[word]], None]  # open declaration
+                        stack.append(unnamed)
+                    statement.clear()
+                    waiting.clear()
+                elif word in self.closers and depth == 0:  # if keyword ends declaration
+                    closed = adjacent + [(closed_end, list(stack))]  # keyword still belongs to declaration
+                    tag = self.tags[self.closers[word]]
+                    while stack and stack[-1][1] != tag:  # while innermost scope is not ended by keyword
+                        stack.pop()
+                        if record:
+                            state.errors.append(position)
+                    if stack:  # if declaration is open
+                        stack.pop()
+                    elif record:  # if keyword does not end any declaration
+                        state.errors.append(position)
+                    statement.clear()
+                    waiting.clear()
+                    base = gate = None
+                    labelled = True
+                elif word in self.blocks and depth == 0:  # if keyword starts new statement
+                    statement.clear()
+                    waiting.clear()
+                    labelled = True
+                elif depth == 0:  # if token is part of statement
+                    statement.append((word, position))
+                previous = word
+                continue
+
+            previous = None  # token is a symbol
+            if depth == 0:  # if symbol is outside brackets
+                if word == ';':  # if statement ends
+                    if base is not None:  # if semicolon belongs to instantiation
+                        closed = adjacent + [(closed_end, list(stack))]
+                    while base is not None and stack:  # if instantiation ends
+                        if stack.pop()[1] == self.tags['kInstantiationBase']:  # if instantiation scope is closed
+                            break
+                    statement.clear()
+                    waiting.clear()
+                    base = gate = unnamed = None
+                    if record and (not state.offsets or position - state.offsets[-1] >= state.interval):
+                        state.offsets.append(position + 1)  # scanning can restart after semicolon
+                        state.stacks.append(tuple(tuple(scope) for scope in stack))
+                elif word == '(':  # if round bracket may start port list
+                    header = self.instance(statement) if base is None else None  # check instantiation header
+                    if header is not None:  # if statement is an instantiation
+                        base = [header[0][1], self.tags['kInstantiationBase'], header[0][0]]  # module name
+                        stack.append(base)
+                        name = header[1]
+                    elif base is not None and statement and self.identifier(statement[0][0]):  # if next instance
+                        name = statement[0]
+                    else:  # if bracket is not a port list
+                        name = None
+                    if name is not None:  # if port list of instance starts
+                        gate = [name[1], self.tags['kGateInstance'], name[0]]  # instance name
+                        stack.append(gate)
+                        for offset, chain in waiting:  # for each offset inside header
+                            if header is not None and offset >= base[0]:  # if offset is after module name
+                                chain.append(base)
+                            if offset >= gate[0]:  # if offset is after instance name
+                                chain.append(gate)
+                    parameters = bool(statement) and statement[-1][0] == '#'  # parameters precede instance name
+                    if not parameters:  # if header cannot continue after bracket
+                        waiting.clear()
+                    statement.append(('()', position))
+                elif word == '[':  # if square bracket may be instance array range
+                    statement.append(('[]', position))
+                elif word == ',' and base is not None:  # if another instance of same module follows
+                    statement.clear()
+                    waiting.clear()
+                elif word == ':' and labelled:  # if block is labelled
+                    label = True
+                else:  # if symbol is part of statement
+                    statement.append((word, position))
+            labelled = False
+            if word in '([{':  # if bracket opens
+                depth += 1
+            elif word in ')]}' and depth:  # if bracket closes
+                depth -= 1
+                if depth == 0 and gate is not None and stack and stack[-1] is gate:  # if port list ends
+                    closed = adjacent + [(closed_end, list(stack))]  # bracket still belongs to instance
+                    stack.pop()
+                    gate = None
+        for offset in offsets[pending:]:  # for each offset after last token
+            chains.append(self.chain(offset, stack, closed))
+        state.scanned = max(state.scanned, offsets[-1])  # markers and errors before last offset are known
+        return chains
+
+
+class HDL_Automation_live_tree:
+    '''Last syntax tree of one buffer with regions edited since it has been parsed'''
+
+    def __init__(self, tree, size, change_count):
+        '''Bind syntax tree to buffer of size characters at change count'''
+        self.tree = tree  # syntax tree with offsets of parsed content
+        self.size = size  # expected number of characters in buffer
+        self.change_count = change_count  # change count of parsed content
+        self.log = []  # replaced region and inserted length of each change not folded into regions yet
+        self.regions = []  # sorted, disjoint [start, end, parsed start, parsed end] edited regions
+
+    def changed(self, begin, end, length):
+        '''Log change replacing characters between begin and end with length characters'''
+        self.log.append((begin, end, length))
+        self.size += length - (end - begin)  # update expected number of characters
+        if len(self.log) >= HDL_Automation_live_trees.log_limit:  # if log grows long
+            self.fold()
+
+    def fold(self):
+        '''Merge logged changes into edited regions'''
+        regions = self.regions
+        for begin, end, length in self.log:  # for each change in order
+            delta = length - (end - begin)  # get shift of following text
+            first = 0  # index of first region touching change
+            while first < len(regions) and regions[first][1] < begin:  # while region is before change
+                first += 1
+            last = first  # index of first region after change
+            while last < len(regions) and regions[last][0] <= end:  # while region touches change
+                last += 1
+            touched = regions[first:last]
+            if touched and touched[0][0] <= begin:  # if change starts inside edited region
+                start, parsed_start = touched[0][0], touched[0][2]
+            else:  # if change starts in parsed text
+                start, parsed_start = begin, self.parsed(begin, first)
+            if touched and touched[-1][1] >= end:  # if change ends inside edited region
+                stop, parsed_stop = touched[-1][1], touched[-1][3]
+            else:  # if change ends in parsed text
+                stop, parsed_stop = end, self.parsed(end, last)
+            regions[first:last] = [[start, stop + delta, parsed_start, parsed_stop]]  # merge touched regions
+            for region in regions[first + 1:]:  # for each region after change
+                region[0] += delta
+                region[1] += delta
+            if len(regions) > HDL_Automation_live_trees.region_limit:  # if too many regions are tracked
+                regions[:] = [[regions[0][0], regions[-1][1], regions[0][2], regions[-1][3]]]  # merge everything
+        self.log.clear()
+
+    def parsed(self, offset, index):
+        '''Return parsed offset of unedited character offset following edited region before index'''
+        if index == 0:  # if no region is before offset
+            return offset
+        region = self.regions[index - 1]  # get nearest region before offset
+        return offset - region[1] + region[3]
+
+    def chain(self, offset):
+        '''Return indexes of nodes enclosing character offset of current content, None when edits may have changed
+        them'''
+        if self.log:  # if changes are not folded yet
+            self.fold()
+        parsed = offset  # offset in parsed content
+        for region in self.regions:  # for each edited region in order
+            if region[0] > offset:  # if region is after offset
+                break
+            if region[1] >= offset:  # if offset is inside edited text
+                return None
+            parsed = offset - region[1] + region[3]
+        chain = self.tree.chain(parsed)
+        if chain:  # if offset is inside any node
+            start, end = self.tree.starts[chain[-1]], self.tree.ends[chain[-1]]  # get innermost enclosing node
+            for region in self.regions:  # for each edited region
+                if region[2] <= end and region[3] >= start:  # if edit overlaps node answering the query
+                    return None
+        return chain
+
+    def html(self, chain):
+        '''Describe chain of nodes as popup content'''
+        return self.tree.html(chain)
+
+    def text(self, chain):
+        '''Describe chain of nodes as a single status bar line'''
+        return self.tree.text(chain)
+
+
+class HDL_Automation_live_trees:
+    '''Keep last syntax tree of each buffer usable after edits elsewhere instead of parsing again'''
+
+    log_limit = 64  # number of logged changes folded at once
+    region_limit = 256  # maximal number of separate edited regions, more are merged
+
+    def __init__(self):
+        '''Create empty tracker'''
+        self.buffers = {}  # live syntax tree by buffer id
+
+    def put(self, view, tree):
+        '''Remember syntax tree of current content of view'''
+        self.buffers[view.buffer_id()] = HDL_Automation_live_tree(tree, view.size(), view.change_count())
+
+    def changed(self, buffer_id, changes):
+        '''Log changes of buffer'''
+        live = self.buffers.get(buffer_id)
+        if live is not None:  # if buffer has been parsed
+            for change in changes:  # for each change in order
+                live.changed(change.a.pt, change.b.pt, len(change.str))
+
+    def get(self, view, offsets):
+        '''Return live syntax tree of view if no edit overlaps nodes enclosing character offsets, otherwise None'''
+        live = self.buffers.get(view.buffer_id())
+        if live is None:  # if buffer has not been parsed
+            return None
+        edited = live.log or live.regions  # True when changes have been logged
+        if live.size != view.size() or (not edited and live.change_count != view.change_count()):  # if changes missed
+            del self.buffers[view.buffer_id()]  # forget untrusted syntax tree
+            return None
+        for offset in offsets:  # for each queried offset
+            if live.chain(offset) is None:  # if edits may have changed enclosing nodes
+                return None
+        return live
+
+    def discard(self, buffer_id):
+        '''Forget closed buffer'''
+        self.buffers.pop(buffer_id, None)
+
+
+class HDL_Automation_scope_status:
+    '''Show modules and instances enclosing first cursor in status bar'''
+
+    key = 'HDL_Automation_scope'  # status bar key
+    delay = 300  # idle time in milliseconds before edited view is parsed
+
+    def __init__(self):
+        '''Create indicator without scheduled scans'''
+        self.resuming = set()  # ids of views whose scan continues once editor has responded
+        self.generations = {}  # number of scheduled parses by view id, used to debounce edits
+
+    def update(self, view, config):
+        '''Show scopes enclosing first cursor, parse in background only when edits may have changed them'''
+        selections = view.sel()
+        if not config.scope_status or len(selections) == 0:  # if indicator is disabled or view has no cursor
+            view.erase_status(self.key)
+            return
+        offset = selections[0].end()  # get ending point of first selection
+        tree = None  # index answering the query
+        strategy = policy.strategy(view, config)  # inspect large files with built-in tokenizer only
+        if config.scope_scanner or strategy == 'tokens':  # if built-in tokenizer should answer first
+            guess, ambiguous = scope_scanner.scan(view, [offset])  # find scopes without Verible
+            if guess is None:  # if large file has been scanned only partly
+                if view.id() not in self.resuming:  # if no continuation is scheduled
+                    self.resuming.add(view.id())
+                    sublime.set_timeout(lambda: self.resume(view))  # scan next slice once editor has responded
+                return
+            if not ambiguous or strategy == 'tokens':  # if scanner is sure about the scope or has to be
+                tree = guess
+        if tree is None:  # if Verible has to answer
+            tree = live_trees.get(view, [offset])  # reuse last syntax tree when edits are elsewhere
+        if tree is None:  # if edits may have changed the scope
+            self.schedule(view)  # keep last answer until edits pause and content is parsed
+        else:  # if scope is known
+            self.show(view, tree, offset)
+
+    def resume(self, view):
+        '''Continue scanning large view'''
+        self.resuming.discard(view.id())
+        if view.is_valid():  # if view is still open
+            self.update(view, settings.snapshot())
+
+    def show(self, view, tree, offset):
+        '''Show scopes enclosing offset'''
+        text = tree.text(tree.chain(offset))  # describe enclosing scopes
+        if text:  # if offset is inside a scope
+            view.set_status(self.key, text)
+        else:  # if offset is outside of all scopes
+            view.erase_status(self.key)
+
+    def schedule(self, view):
+        '''Parse view when it has not been edited for a while'''
+        running = jobs.running.get((view.id(), 'Scope Status'))  # get running parse of view
+        if running is not None and running.change_count == view.change_count():  # if content is being parsed
+            return
+        generation = self.generations.get(view.id(), 0) + 1  # count edit
+        self.generations[view.id()] = generation
+        sublime.set_timeout_async(lambda: self.idle(view, generation), self.delay)  # parse view unless edited again
+
+    def idle(self, view, generation):
+        '''Read and hash content of view outside of main thread if it has not been edited since generation'''
+        if self.generations.get(view.id()) != generation or not view.is_valid():  # if view is edited or closed
+            return
+        change_count = view.change_count()  # get buffer state of content
+        content = policy.content(view)  # get file content as byte string
+        digest = syntax_tree_cache.digest(content)  # get hash of file content
+        sublime.set_timeout(lambda: self.refresh(view, generation, change_count, content, digest))
+
+    def refresh(self, view, generation, change_count, content, digest):
+        '''Parse content of view in background unless view has changed meanwhile'''
+        if self.generations.get(view.id()) != generation or not view.is_valid():  # if view is edited or closed
+            return
+        if view.change_count() != change_count:  # if content is outdated
+            return
+        config = settings.snapshot()  # get settings
+        tree = syntax_tree_cache.find(view, digest)  # get syntax tree of the same content
+        if tree is not None:  # if content has been parsed before
+            self.parsed(view, digest, tree, False)
+            return
+        process = config.syntax_process  # export syntax tree of stdin
+        jobs.submit(
+            view,  # run request for current view
+            'Scope Status',  # cancel older parses of current view
+            lambda job: ScopeNameCommand(view).parse(job, process, content),  # parse in background
+            lambda tree: self.parsed(view, digest, tree),  # show scopes when file content is still the same
+            quiet=True  # discard outdated syntax tree silently
+        )
+
+    def discard(self, view):
+        '''Forget closed view'''
+        self.generations.pop(view.id(), None)
+        self.resuming.discard(view.id())
+
+    def parsed(self, view, digest, tree, new=True):
+        '''Remember syntax tree of unchanged file content and show scopes enclosing first cursor'''
+        if new:  # if content has just been parsed
+            syntax_tree_cache.put(view, digest, tree, tree.size())  # remember syntax tree of content
+        live_trees.put(view, tree)  # answer next queries from this syntax tree
+        if len(view.sel()) > 0:  # if view has a cursor
+            self.show(view, tree, view.sel()[0].end())
+
+
+class HDL_Automation_declarations:
+    '''Collect declarations with their ports and instances from Verible syntax tree'''
+
+    # declaration keyword of each declaration node
+    kinds = {
+        'kModuleDeclaration': 'module',
+        'kInterfaceDeclaration': 'interface',
+        'kProgramDeclaration': 'program',
+        'kPackageDeclaration': 'package',
+    }
+
+    def __init__(self, content):
+        '''Create empty collection for file content'''
+        self.content = content  # file content as byte string
+        self.declarations = []  # kind, name, starting and ending byte offset and ports of each declaration
+        self.instances = []  # enclosing declaration, module, instance name and byte offset of each instance
+        self.tags = []  # tag of each open node
+        self.scopes = []  # open declarations
+        self.ports = []  # open port declarations as name and True when last identifier names port
+        self.bases = []  # open instantiations as module name
+        self.gates = []  # open instances as name and starting byte offset
+        self.dimensions = 0  # number of open dimension nodes
+        self.last_end = 0  # ending offset of last leaf
+
+    def open(self, tag):
+        '''Enter syntax tree node'''
+        self.tags.append(tag)
+        if tag in self.kinds:  # if node is a declaration
+            self.scopes.append([self.kinds[tag], None, None, None, []])
+        elif tag in ['kPortDeclaration', 'kPort'] and self.scopes:  # if node declares port
+            self.ports.append([None, tag == 'kPortDeclaration'])
+        elif tag == 'kInstantiationBase':  # if node may instantiate module
+            self.bases.append(None)
+        elif tag == 'kGateInstance' and self.bases:  # if node is an instance
+            self.gates.append([None, None])
+        elif 'Dimension' in tag:  # if node is a dimension of declaration
+            self.dimensions += 1
+
+    def leaf(self, tag, start, end):
+        '''Visit syntax tree leaf'''
+        if self.scopes and self.scopes[-1][2] is None:  # if declaration has no leaves yet
+            self.scopes[-1][2] = start  # declaration starts with this leaf
+        if self.gates and self.gates[-1][1] is None:  # if instance has no leaves yet
+            self.gates[-1][1] = start  # instance starts with this leaf
+        if tag == 'SymbolIdentifier':  # if leaf is an identifier
+            name = self.content[start:end].decode('utf-8', 'replace')  # get identifier text
+            if self.scopes and self.scopes[-1][1] is None:  # if declaration is not named yet
+                self.scopes[-1][1] = name
+            if self.ports and self.dimensions == 0:  # if identifier is not a dimension of port
+                if self.ports[-1][1] or self.ports[-1][0] is None:  # if identifier may name port
+                    self.ports[-1][0] = name
+            if self.bases and self.bases[-1] is None:  # if instantiated module is not known yet
+                self.bases[-1] = name
+            if self.gates and self.gates[-1][0] is None:  # if instance is not named yet
+                self.gates[-1][0] = name
+        self.last_end = end
+
+    def close(self):
+        '''Leave syntax tree node'''
+        tag = self.tags.pop()
+        if tag in self.kinds:  # if declaration ends
+            scope = self.scopes.pop()
+            scope[3] = self.last_end  # declaration ends with last leaf
+            if scope[1] is not None:  # if declaration is named
+                self.declarations.append(scope)
+        elif tag in ['kPortDeclaration', 'kPort'] and self.scopes:  # if port declaration ends
+            name = self.ports.pop()[0]
+            if name is not None and name not in self.scopes[-1][4]:  # if port is named and new
+                self.scopes[-1][4].append(name)
+        elif tag == 'kInstantiationBase':  # if instantiation ends
+            self.bases.pop()
+        elif tag == 'kGateInstance' and self.bases:  # if instance ends
+            name, start = self.gates.pop()
+            if name is not None and self.bases[-1] is not None:  # if instance and module are named
+                parent = self.scopes[-1][1] if self.scopes else None  # get enclosing declaration
+                self.instances.append([parent, self.bases[-1], name, start])
+        elif 'Dimension' in tag:  # if dimension ends
+            self.dimensions -= 1
+
+
+class HDL_Automation_module_index:
+    '''Persistent index of declarations and instances of project files'''
+
+    batch_size = 64  # maximal number of files parsed by one Verible Parser
+    copies = 64  # estimated peak memory of indexing a file as multiple of its size, JSON syntax tree and its objects
+
+    def __init__(self, folders):
+        '''Open index of project folders'''
+        self.folders = folders  # indexed project folders
+        digest = hashlib.sha1(json.dumps(sorted(folders)).encode()).hexdigest()  # identify project
+        path = os.path.join(sublime.cache_path(), 'HDL_Automation', f"index-{digest}.sqlite3")
+        os.makedirs(os.path.dirname(path), exist_ok=True)  # create cache folder
+        self.lock = threading.Lock()  # guard connection used by main and background threads
+        self.connection = sqlite3.connect(path, check_same_thread=False)  # open index database
+        with self.lock, self.connection:  # create tables of new index
+            self.connection.executescript('''
+                CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL, size INTEGER, digest TEXT);
+                CREATE TABLE IF NOT EXISTS declarations (
+                    path TEXT, kind TEXT, name TEXT, start INTEGER, end INTEGER, row INTEGER, col INTEGER, ports TEXT
+                );
+                CREATE TABLE IF NOT EXISTS instances (
+                    path TEXT, parent TEXT, module TEXT, name TEXT, start INTEGER, row INTEGER, col INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS declarations_name ON declarations (name);
+                CREATE INDEX IF NOT EXISTS declarations_path ON declarations (path);
+                CREATE INDEX IF NOT EXISTS instances_parent ON instances (parent);
+                CREATE INDEX IF NOT EXISTS instances_module ON instances (module);
+                CREATE INDEX IF NOT EXISTS instances_path ON instances (path);
+            ''')
+        self.refreshing = None  # token of full update running in background, None when no full update runs
+
+    def query(self, sql, parameters=()):
+        '''Return all rows of query'''
+        with self.lock:  # prevent concurrent use of connection
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def refresh(self, config, paths=None):
+        '''Update index in background from files changed since last update, or only from given paths'''
+        if self.refreshing and paths is None:  # if full update is already running
+            return
+        token = None  # token of full update
+        if paths is None:  # if whole project is updated
+            token = self.refreshing = object()  # mark full update as running
+        threading.Thread(
+            target=self.update,  # update index
+            args=(config, paths, token),  # with Verible Parser arguments and limits
+            name='HDL_Automation_module_index',
+            daemon=True
+        ).start()
+
+    def update(self, config, paths, token=None):
+        '''Parse new and changed files in parallel and forget removed files, token identifies full update, files
+        above `syntax_tree_size_limit` or `memory_budget` are left out of index'''
+        start = time.perf_counter()  # remember starting time
+        try:  # make sure update is marked as finished
+            known = {path: (mtime, size, digest) for path, mtime, size, digest in self.query('SELECT * FROM files')}
+            if paths is None:  # if whole project is updated
+                paths = []  # Verilog and SystemVerilog files of project
+                for folder in self.folders:  # for each project folder
+                    for root, folder_names, file_names in os.walk(folder):  # for each nested folder
+                        folder_names[:] = [name for name in folder_names if not name.startswith('.')]  # skip hidden
+                        for file_name in file_names:  # for each file of folder
+                            path_root, path_ext = os.path.splitext(file_name)  # split file name into root and extension
+                            if path_ext.lower() in ['.v', '.vh', '.sv', '.svh']:  # if file is Verilog or SystemVerilog
+                                paths.append(os.path.join(root, file_name))
+                removed = set(known) - set(paths)  # files which do not exist anymore
+            else:  # if only given files are updated
+                removed = {path for path in paths if not os.path.isfile(path)}
+                paths = [path for path in paths if path not in removed]
+            allowance = HDL_Automation_allowance(config.memory_budget)  # memory budget shared by parsers
+            changed = []  # files which have to be parsed
+            skipped = []  # files too large to be parsed
+            sizes = {}  # size of each changed file
+            for path in paths:  # for each file
+                try:  # prevent file removed in the meantime
+                    stat = os.stat(path)
+                except OSError:  # if file cannot be read
+                    removed.add(path)
+                    continue
+                if known.get(path, (None, None))[:2] == (stat.st_mtime, stat.st_size):  # if file has not changed
+                    continue
+                limit = config.syntax_tree_size_limit  # size above which Verible must not parse file
+                if (limit and stat.st_size > limit) or not allowance.fits(stat.st_size * self.copies):  # if too large
+                    skipped.append(path)
+                    if path in known:  # if older content of file is indexed
+                        removed.add(path)  # forget outdated declarations
+                    continue
+                changed.append(path)
+                sizes[path] = stat.st_size
+            batches = {}  # files parsed together by folder
+            for path in changed:  # for each changed file
+                batches.setdefault(os.path.dirname(path), []).append(path)
+            groups = []  # files parsed by one Verible Parser with their estimated peak memory
+            for folder, files in batches.items():  # for each folder with changed files
+                group, needed = [], 0  # files of next batch and their estimated peak memory
+                for path in files:  # for each changed file of folder
+                    size = sizes[path] * self.copies  # estimate peak memory of file
+                    if group and (len(group) == self.batch_size or not allowance.fits(needed + size)):  # if full
+                        groups.append((folder, group, needed))
+                        group, needed = [], 0
+                    group.append(path)
+                    needed += size
+                if group:  # if last batch of folder has files
+                    groups.append((folder, group, needed))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+                for results in executor.map(lambda group: self.parse(config, known, allowance, *group), groups):
+                    self.store(results)  # store parsed files
+            with self.lock, self.connection:  # forget removed files
+                for path in removed:  # for each removed file
+                    for table in ['files', 'declarations', 'instances']:  # for each table
+                        self.connection.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+            if changed or removed:  # if index has changed
+                print(
+                    f"HDL_Automation: Module index updated {len(changed)} and removed {len(removed)} files"
+                    f" in {time.perf_counter() - start:.2f} s"
+                )
+            if skipped:  # if some files are too large
+                print(
+                    f"HDL_Automation: Module index skipped {len(skipped)} files above `syntax_tree_size_limit`"
+                    f" or `memory_budget`"
+                )
+        except Exception as err:  # if index cannot be updated
+            print(f"HDL_Automation: Module index update failed with `{err}`")
+        finally:
+            if token is not None and self.refreshing is token:  # if this full update is marked as running
+                self.refreshing = None
+
+    def parse(self, config, known, allowance, folder, paths, needed):
+        '''Parse files of single folder with one Verible Parser once needed bytes fit memory budget and return their
+        rows'''
+        allowance.acquire(needed)  # wait for memory held by other parsers
+        try:  # make sure memory is returned to other parsers
+            return self.parse_files(config, known, folder, paths, needed)
+        finally:
+            allowance.release(needed)
+
+    def parse_files(self, config, known, folder, paths, needed):
+        '''Parse files of single folder with one Verible Parser and return their rows, Verible output may hold half
+        of needed bytes'''
+        contents = {}  # content of each parsed file
+        results = []  # file, declarations and instances rows of each file
+        for path in paths:  # for each file
+            try:  # prevent file removed in the meantime
+                stat = os.stat(path)
+                with open(path, 'rb') as file:  # read file content
+                    content = file.read()
+            except OSError:  # if file cannot be read
+                continue
+            digest = hashlib.sha1(content).hexdigest()  # get hash of file content
+            file_row = (path, stat.st_mtime, stat.st_size, digest)
+            if path in known and known[path][2] == digest:  # if file was only touched
+                results.append((file_row, None, None))  # keep its declarations and instances
+            else:  # if file content has changed
+                contents[os.path.basename(path)] = (file_row, content)
+        if contents:  # if any file has to be parsed
+            try:  # prevent OSError and HDL_Automation_missing_tool
+                parser = tools.popen(
+                    config.index_process + tuple(contents),  # parse files of folder by relative paths
+                    cwd=folder,  # resolve relative paths from folder, also under Windows Subsystem for Linux
+                    stdin=subprocess.DEVNULL,  # do not wait for input
+                    stdout=subprocess.PIPE,  # collect output
+                    stderr=subprocess.DEVNULL  # ignore syntax errors
+                )
+            except (OSError, HDL_Automation_missing_tool):  # if Verible Parser cannot be started
+                return results
+            limit = needed // 2 if config.memory_budget else 0  # maximal number of output bytes, 0 when unlimited
+            output = bytearray()  # JSON output
+            for chunk in iter(lambda: parser.stdout.read(HDL_Automation_job.chunk_size), b''):  # for each chunk
+                if limit and len(output) + len(chunk) > limit:  # if output exceeds estimate
+                    parser.kill()  # stop Verible Parser
+                    output = None
+                    break
+                output += chunk
+            parser.stdout.close()
+            parser.wait()  # wait for subprocess, syntax errors give non-zero return code
+            if output is None:  # if output has been cut
+                print(f"HDL_Automation: Module index skipped files of `{folder}`, output exceeded `memory_budget`")
+                return results
+            try:  # prevent ValueError
+                trees = json.loads(output)  # get syntax tree of each file
+            except ValueError:  # if output is not readable
+                print(f"HDL_Automation: Module index could not parse files of `{folder}`")
+                trees = {}
+            for name, (file_row, content) in contents.items():  # for each parsed file
+                tree = trees.get(name) or {}
+                if tree.get('tree') is None:  # if file has no syntax tree
+                    continue  # leave file unrecorded, so it is parsed again by next update
+                declarations = HDL_Automation_declarations(content)  # collect declarations
+                HDL_Automation_scope_tree.walk(tree['tree'], declarations)  # visit syntax tree
+                results.append((file_row, *self.rows(file_row[0], content, declarations)))
+        return results
+
+    def rows(self, path, content, declarations):
+        '''Return declarations and instances rows with character offsets and positions'''
+        offsets = [scope[2] for scope in declarations.declarations] + [scope[3] for scope in declarations.declarations]
+        offsets += [instance[3] for instance in declarations.instances]
+        characters = HDL_Automation_scope_tree.characters(content, offsets)  # convert byte offsets
+
+        def position(offset):
+            '''Return 0-based row and column of byte offset'''
+            line_start = content.rfind(b'\n', 0, offset) + 1  # get offset of line
+            return content.count(b'\n', 0, offset), len(content[line_start:offset].decode('utf-8', 'replace'))
+
+        declaration_rows = [
+            (path, kind, name, characters[start], characters[end], *position(start), json.dumps(ports))
+            for kind, name, start, end, ports in declarations.declarations
+        ]
+        instance_rows = [
+            (path, parent, module, name, characters[start], *position(start))
+            for parent, module, name, start in declarations.instances
+        ]
+        return declaration_rows, instance_rows
+
+    def store(self, results):
+        '''Replace rows of parsed files'''
+        with self.lock, self.connection:  # store all files in a single transaction
+            for file_row, declaration_rows, instance_rows in results:  # for each parsed file
+                self.connection.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)', file_row)
+                if declaration_rows is not None:  # if file content has changed
+                    self.connection.execute('DELETE FROM declarations WHERE path = ?', (file_row[0],))
+                    self.connection.execute('DELETE FROM instances WHERE path = ?', (file_row[0],))
+                    self.connection.executemany('INSERT INTO declarations VALUES (?, ?, ?, ?, ?, ?, ?, ?)', declaration_rows)
+                    self.connection.executemany('INSERT INTO instances VALUES (?, ?, ?, ?, ?, ?, ?)', instance_rows)
+
+    def definitions(self, name):
+        '''Return path, kind, row, column and ports of each declaration named name'''
+        return self.query('SELECT path, kind, row, col, ports FROM declarations WHERE name = ? ORDER BY path', (name,))
+
+    def enclosing(self, path, offset):
+        '''Return name of innermost declaration of file enclosing character offset or None'''
+        rows = self.query(
+            'SELECT name FROM declarations WHERE path = ? AND start <= ? AND ? <= end ORDER BY start DESC LIMIT 1',
+            (path, offset, offset)
+        )
+        return rows[0][0] if rows else None
+
+    def children(self, module):
+        '''Return module, instance name, path, row and column of each instance inside module'''
+        return self.query(
+            'SELECT module, name, path, row, col FROM instances WHERE parent = ? ORDER BY path, start', (module,)
+        )
+
+    def parents(self, module):
+        '''Return enclosing declaration, instance name, path, row and column of each instance of module'''
+        return self.query(
+            'SELECT parent, name, path, row, col FROM instances WHERE module = ? ORDER BY parent, path', (module,)
+        )
+
+    def close(self):
+        '''Close index database'''
+        with self.lock:  # wait for running query
+            self.connection.close()
+
+
+class HDL_Automation_module_indexes:
+    '''Keep one module index per set of project folders'''
+
+    def __init__(self):
+        '''Create empty set of indexes'''
+        self.indexes = {}  # index by sorted project folders
+
+    def get(self, window):
+        '''Return index of window project, updated in background on first use, or None without folders'''
+        folders = tuple(sorted(window.folders()))  # get project folders
+        if not folders:  # if window has no project folders
+            return None
+        index = self.indexes.get(folders)
+        if index is None:  # if index is used first time
+            index = self.indexes[folders] = HDL_Automation_module_index(list(folders))  # open stored index
+            index.refresh(settings.snapshot())  # bring index up to date in background
+        return index
+
+    def saved(self, view):
+        '''Update file of saved view in indexes of projects containing it'''
+        file_name = view.file_name()  # get current file path
+        for folders, index in self.indexes.items():  # for each opened index
+            for folder in folders:  # for each project folder
+                if file_name.startswith(os.path.join(folder, '')):  # if file belongs to project
+                    index.refresh(settings.snapshot(), [file_name])
+                    break
+
+    def close(self):
+        '''Close all indexes'''
+        for index in self.indexes.values():  # for each opened index
+            index.close()
+        self.indexes.clear()
+
+
+class HDL_Automation_trace:
+    '''Durations of phases of a single command'''
+
+    def __init__(self, name):
+        '''Start measuring command'''
+        self.name = name  # name of measured command
+        self.start = time.perf_counter()  # starting time of command
+        self.last = self.start  # ending time of last phase
+        self.phases = []  # name and duration in seconds of each phase in order
+
+    def lap(self, phase):
+        '''End phase which has started with the end of previous phase'''
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def total(self):
+        '''Return duration of command until end of last phase in seconds'''
+        return self.last - self.start
+
+
+class HDL_Automation_timings:
+    '''Remember phase durations of recent commands'''
+
+    limit = 500  # maximal number of remembered commands
+
+    def __init__(self):
+        '''Create empty ring buffer'''
+        self.traces = collections.deque(maxlen=self.limit)  # finished commands, oldest first
+
+    def add(self, trace):
+        '''Remember finished command and log it when it is slow'''
+        self.traces.append(trace)
+        threshold = settings.snapshot().slow_command_threshold  # get threshold in milliseconds
+        if threshold and trace.total() * 1000 >= threshold:  # if command is slow
+            phases = ', '.join(f"{phase} {duration * 1000:.1f}" for phase, duration in trace.phases)
+            print(f"HDL_Automation: {trace.name} took {trace.total() * 1000:.0f} ms ({phases} ms)")
+
+    @staticmethod
+    def percentile(values, percent):
+        '''Return nearest-rank percentile of sorted values'''
+        return values[max(0, -(-len(values) * percent // 100) - 1)]
+
+    def report(self):
+        '''Return p50, p95 and maximum of each phase of each command as text'''
+        commands = collections.OrderedDict()  # durations of each phase by command name
+        for trace in list(self.traces):  # for each remembered command
+            phases = commands.setdefault(trace.name, collections.OrderedDict([('total', [])]))
+            phases['total'].append(trace.total())
+            for phase, duration in trace.phases:  # for each phase of command
+                phases.setdefault(phase, []).append(duration)
+        lines = []  # report lines
+        for name, phases in commands.items():  # for each command
+            lines.append(f"{name} ({len(phases['total'])} runs)")
+            lines.append(f"  {'phase':<16}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+            for phase, durations in phases.items():  # for each phase
+                durations.sort()
+                lines.append(f"  {phase:<16}" + ''.join(
+                    f"{value * 1000:>10.1f}" for value in [
+                        self.percentile(durations, 50), self.percentile(durations, 95), durations[-1]
+                    ]
+                ))
+            lines.append('')
+        return '\n'.join(lines) if lines else 'No commands measured yet\n'
+
+    def baseline(self, config):
+        '''Return text with resolved Verible executables and startup costs of a subprocess without work'''
+        lines = ['Startup without work']
+        probes = [('verible', config.syntax_process[:-2] + ('--version',))]  # measure spawn of Verible Parser
+        if config.windows_subsystem_for_linux:  # if Verible runs under Windows Subsystem for Linux
+            probes.append(('wsl', ('wsl', '-e', 'true')))
+        for name, process in probes:  # for each measured startup
+            start = time.perf_counter()
+            try:  # prevent missing executable
+                tools.popen(
+                    process, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                ).wait()  # wait for startup and exit
+                lines.append(f"  {name:<16}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+            except (OSError, HDL_Automation_missing_tool) as err:  # if startup cannot be measured
+                lines.append(f"  {name:<16}failed with `{err}`")
+        return tools.describe() + '\n' + '\n'.join(lines) + '\n'
+
+
+class HDL_Automation_missing_tool(Exception):
+    '''Raised when Verible executable has not been found, it is reported once when tools are resolved'''
+
+
+class HDL_Automation_tools:
+    '''Resolve Verible executables once and start them without shell'''
+
+    names = {
+        'verible-verilog-format': 'Format',
+        'verible-verilog-syntax': 'Scope Name',
+        'verible-verilog-lint': 'Lint',
+        'verible-verilog-ls': 'Language Server',
+    }  # feature of each executable
+    creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)  # hide console window under Windows
+    idle = 30  # seconds without subprocess after which Windows Subsystem for Linux is warmed up again
+
+    def __init__(self):
+        '''Create resolver which knows no executable'''
+        self.paths = {}  # absolute path of each found executable by name
+        self.versions = {}  # first line of version output of each found executable by name
+        self.missing = set()  # names of executables which have not been found
+        self.wsl = None  # True if executables were resolved under Windows Subsystem for Linux, None before
+        self.generation = 0  # number of started resolutions, older ones are discarded
+        self.last_spawn = 0  # time of last started subprocess
+
+    def resolve(self, config):
+        '''Find executables and their versions in background, report missing or mismatched ones once'''
+        self.generation += 1
+        generation = self.generation  # identify resolution
+        wsl = config.windows_subsystem_for_linux  # resolve where Verible runs
+        needed = {'verible-verilog-format', 'verible-verilog-syntax'}  # executables of enabled features
+        if config.lint:  # if files are linted
+            needed.add('verible-verilog-lint')
+        if config.language_server:  # if commands are served by language server
+            needed.add('verible-verilog-ls')
+        threading.Thread(
+            target=lambda: self.resolved(generation, wsl, needed, self.lookup(wsl)),
+            name='HDL_Automation_tools',
+            daemon=True
+        ).start()
+
+    def lookup(self, wsl):
+        '''Return path and version of each found executable by name'''
+        found = {}
+        self.last_spawn = time.monotonic()
+        if wsl:  # if Verible runs under Windows Subsystem for Linux
+            # find all executables in login shell PATH with single startup, without quotes mangled by Windows
+            script = f"for n in {' '.join(self.names)}; do"
+            script += ' p=$(command -v $n) && echo $n $p $($p --version 2>&1 | head -n 1); done'
+            try:  # prevent OSError and TimeoutExpired
+                output = subprocess.run(
+                    ['wsl', '-e', 'bash', '-lc', script],  # run script in login shell of default distribution
+                    stdin=subprocess.DEVNULL,  # do not wait for input
+                    stdout=subprocess.PIPE,  # collect found executables
+                    stderr=subprocess.DEVNULL,  # ignore shell errors
+                    creationflags=self.creationflags,
+                    timeout=60  # first start of Windows Subsystem for Linux may be slow
+                ).stdout.decode('utf-8', 'replace')
+            except (OSError, subprocess.TimeoutExpired) as err:  # if Windows Subsystem for Linux cannot run
+                print(f"HDL_Automation: Windows Subsystem for Linux could not be started, `{err}`")
+                return found
+            for line in output.splitlines():  # for each found executable
+                name, path, version = (line.split(' ', 2) + ['', ''])[:3]
+                if name in self.names and path:  # if line describes executable
+                    found[name] = (path, version.strip())
+            return found
+        for name in self.names:  # for each executable
+            path = shutil.which(name)  # search PATH once
+            if path is None:  # if executable is not installed
+                continue
+            try:  # prevent OSError and TimeoutExpired
+                output = subprocess.run(
+                    [path, '--version'],  # print version
+                    stdin=subprocess.DEVNULL,  # do not wait for input
+                    stdout=subprocess.PIPE,  # collect version
+                    stderr=subprocess.STDOUT,  # some versions print to stderr
+                    creationflags=self.creationflags,
+                    timeout=10  # do not wait for broken executable
+                ).stdout.decode('utf-8', 'replace')
+            except (OSError, subprocess.TimeoutExpired):  # if version cannot be read
+                output = ''
+            found[name] = (path, (output.strip().splitlines() or [''])[0])
+        return found
+
+    def resolved(self, generation, wsl, needed, found):
+        '''Remember found executables and report problems of latest resolution'''
+        if generation != self.generation:  # if settings have changed meanwhile
+            return
+        self.paths = {name: path for name, (path, version) in found.items()}
+        self.versions = {name: version for name, (path, version) in found.items()}
+        self.missing = set(self.names) - set(found)
+        self.wsl = wsl
+        where = 'Windows Subsystem for Linux' if wsl else 'PATH'  # describe searched location
+        problems = []  # messages of missing or mismatched executables
+        for name in sorted(needed & self.missing):  # for each missing executable of enabled feature
+            problems.append(f"`{name}` was not found in {where}, {self.names[name]} is unavailable")
+        versions = {version for name, version in self.versions.items() if version}  # get distinct versions
+        if len(versions) > 1:  # if executables come from different Verible releases
+            problems.append('Verible executables come from different releases: ' + ', '.join(
+                f"`{name}` {version}" for name, version in sorted(self.versions.items())
+            ))
+        for problem in problems:  # for each problem
+            print(f"HDL_Automation: {problem}")
+        if problems:  # if user should fix installation
+            sublime.set_timeout(lambda: sublime.status_message(f"HDL_Automation: {problems[0]}"))
+
+    def command(self, process):
+        '''Return arguments of process with Verible executable replaced by its resolved path,
+        raise HDL_Automation_missing_tool when executable has not been found'''
+        wsl = process[0] == 'wsl'  # check if process runs under Windows Subsystem for Linux
+        name = process[1] if wsl else process[0]  # get Verible executable
+        if self.wsl != wsl or name not in self.names:  # if executable has not been resolved for this location
+            return list(process)  # let operating system search PATH
+        if name in self.missing:  # if executable has not been found
+            raise HDL_Automation_missing_tool(f"`{name}` was not found")
+        path = self.paths.get(name, name)
+        return ['wsl', '-e', path, *process[2:]] if wsl else [path, *process[1:]]  # skip login shell
+
+    def popen(self, process, **kwargs):
+        '''Start process without shell and console window'''
+        self.last_spawn = time.monotonic()
+        return subprocess.Popen(self.command(process), creationflags=self.creationflags, **kwargs)
+
+    def warm_up(self, config):
+        '''Start Windows Subsystem for Linux in background when it may have stopped since last subprocess'''
+        if not config.windows_subsystem_for_linux or not config.windows_subsystem_for_linux_warm_up:
+            return
+        if time.monotonic() - self.last_spawn < self.idle:  # if Windows Subsystem for Linux is still running
+            return
+        self.last_spawn = time.monotonic()
+        threading.Thread(target=lambda: subprocess.run(
+            ['wsl', '-e', 'true'],  # start default distribution without running anything
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            creationflags=self.creationflags
+        ), name='HDL_Automation_warm_up', daemon=True).start()
+
+    def describe(self):
+        '''Return text with resolved path and version of each executable'''
+        if self.wsl is None:  # if executables have not been resolved yet
+            return 'Verible executables are being resolved\n'
+        lines = ['Verible executables' + (' (Windows Subsystem for Linux)' if self.wsl else '')]
+        for name in self.names:  # for each executable
+            if name in self.paths:  # if executable has been found
+                lines.append(f"  {name:<24}{self.paths[name]} {self.versions[name]}")
+            else:  # if executable is missing
+                lines.append(f"  {name:<24}not found")
+        return '\n'.join(lines) + '\n'
+
+
+class HDL_Automation_cancelled(Exception):
+    '''Raised in background when newer request of the same command arrives for the same view'''
+
+
+class HDL_Automation_job:
+    '''Single background request of a command for a view'''
+
+    def __init__(self, view, name):
+        '''Bind request to the current state of view'''
+        self.view = view  # view which has requested command
+        self.name = name  # name of requested command
+        self.change_count = view.change_count()  # buffer state of request
+        self.cancelled = False  # True when newer request has arrived
+        self.process = None  # running subprocess
+        self.quiet = False  # True when discarded result is not reported
+        self.budget = 0  # maximal number of output bytes kept by communicate, 0 when unlimited
+        self.reason = None  # why request has been stopped before newer request has arrived
+        self.trace = HDL_Automation_trace(name)  # durations of request phases
+        self.lock = threading.Lock()  # guard subprocess against concurrent cancellation
+
+    chunk_size = 64 * 1024  # number of bytes written to stdin at once
+
+    def communicate(self, process, content):
+        '''Run subprocess with content on stdin and return its stdout, raise HDL_Automation_cancelled when cancelled
+        or when output exceeds memory budget'''
+        output = []  # output lines
+        size = 0  # number of output bytes
+        for line in self.stream(process, content):  # for each output line as soon as it arrives
+            size += len(line)
+            if self.budget and size > self.budget:  # if output does not fit memory budget
+                self.stop('stopped, Verible output exceeded `memory_budget`')
+                raise HDL_Automation_cancelled()
+            output.append(line)
+        return b''.join(output)
+
+    def stream(self, process, content):
+        '''Run subprocess with content on stdin and yield its stdout line by line while it runs,
+        raise HDL_Automation_cancelled when cancelled and CalledProcessError after non-zero return code'''
+        with self.lock:  # prevent cancellation while subprocess is starting
+            if self.cancelled:  # if newer request has arrived
+                raise HDL_Automation_cancelled()
+            self.process = tools.popen(
+                process,  # pass process parameters
+                stdin=subprocess.PIPE,  # pass file content to stdin
+                stdout=subprocess.PIPE,  # collect output
+                stderr=subprocess.PIPE  # collect errors
+            )  # start subprocess
+        self.trace.lap('spawn')
+        errors = []  # error output, read aside so a full pipe cannot block subprocess
+        threads = [
+            threading.Thread(target=self.write, args=(self.process.stdin, content), daemon=True),
+            threading.Thread(target=lambda: errors.append(self.process.stderr.read()), daemon=True),
+        ]
+        for thread in threads:  # for each helper thread
+            thread.start()
+        try:  # stop subprocess when caller stops reading
+            yield from self.process.stdout  # pass output lines as soon as they arrive
+        except GeneratorExit:  # if caller has failed or finished early
+            self.process.kill()
+            raise
+        for thread in threads:  # wait for helper threads
+            thread.join()
+        self.process.stdout.close()
+        self.process.stderr.close()
+        self.process.wait()  # wait for subprocess
+        self.trace.lap('verible')
+        if self.cancelled:  # if subprocess has been killed by newer request
+            raise HDL_Automation_cancelled()
+        if self.process.returncode:  # if subprocess returns a non-zero return code
+            raise subprocess.CalledProcessError(self.process.returncode, process, None, b''.join(errors))
+
+    def write(self, stdin, content):
+        '''Write content to stdin of subprocess in chunks and close it'''
+        view = memoryview(content)  # slice content without copying it
+        try:  # prevent subprocess which exits or is killed before reading everything
+            for offset in range(0, len(view), self.chunk_size):  # for each chunk
+                stdin.write(view[offset:offset + self.chunk_size])
+            stdin.close()
+        except OSError:  # if pipe is closed
+            pass
+
+    def cancel(self):
+        '''Stop request and its subprocess'''
+        with self.lock:  # prevent starting subprocess while cancelling
+            self.cancelled = True  # mark request as outdated
+            if self.process is not None and self.process.poll() is None:  # if subprocess is running
+                self.process.kill()  # stop subprocess
+
+    def stop(self, reason):
+        '''Stop request and its subprocess because it has exceeded a budget'''
+        self.reason = reason  # tell user why result is missing
+        self.cancel()
+
+    def is_current(self):
+        '''Returns True if request is not cancelled and buffer has not changed since request'''
+        if self.cancelled or not self.view.is_valid():  # if request is outdated or view is closed
+            return False
+        return self.view.change_count() == self.change_count
+
+
+class HDL_Automation_jobs:
+    '''Run commands in background, one request per command and view'''
+
+    frames = ['[=   ]', '[ =  ]', '[  = ]', '[   =]', '[  = ]', '[ =  ]']  # status bar progress animation
+
+    def __init__(self):
+        '''Create empty set of requests'''
+        self.executor = None  # thread pool is created on first request
+        self.running = {}  # latest request by view id and command name
+
+    def submit(self, view, name, work, done, finished=None, quiet=False, trace=None):
+        '''Call work with request in background and then done with its result if buffer has not changed,
+        finished is called afterwards in any case, quiet requests discard outdated results silently,
+        trace continues measuring phases started by caller'''
+        if self.executor is None:  # if it is first request
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix='HDL_Automation')
+        key = (view.id(), name)  # identify requests of command for view
+        previous = self.running.get(key)  # get older request
+        if previous is not None:  # if older request is still running
+            previous.cancel()  # stop older request
+        job = HDL_Automation_job(view, name)  # create new request
+        job.quiet = quiet  # report discarded result unless request runs on its own
+        config = settings.snapshot()  # get budgets
+        job.budget = config.memory_budget  # limit output kept in memory
+        if config.time_budget:  # if requests are limited in time
+            sublime.set_timeout(lambda: self.expire(key, job, config.time_budget), config.time_budget * 1000)
+        if trace is not None:  # if caller has measured first phases
+            job.trace = trace
+        self.running[key] = job  # mark request as latest
+        self.executor.submit(self.work, key, job, work, done, finished)  # run request in background
+        self.progress(key, job, 0)  # show request in status bar
+        return job
+
+    def work(self, key, job, work, done, finished):
+        '''Run request in background and pass its result to main thread'''
+        job.trace.lap('queue')
+        try:  # prevent HDL_Automation_cancelled
+            result = work(job)  # run request
+        except HDL_Automation_cancelled:  # if newer request has arrived
+            result = None
+        except HDL_Automation_missing_tool as err:  # if Verible is not installed, reported when plugin is loaded
+            if not job.quiet:  # if user waits for result
+                message = f"HDL_Automation: {job.name} failed, {err}"
+                sublime.set_timeout(lambda: sublime.status_message(message))
+            result = None
+        except Exception as err:  # if request has failed unexpectedly
+            print(f"HDL_Automation: {job.name} failed with `{err}`")
+            result = None
+        sublime.set_timeout(lambda: self.finish(key, job, done, finished, result))  # return to main thread
+
+    def expire(self, key, job, budget):
+        '''Stop request which is still running after budget seconds'''
+        if self.running.get(key) is job:  # if request is still running
+            job.stop(f"stopped after {budget} s, more than `time_budget`")
+
+    def finish(self, key, job, done, finished, result):
+        '''Pass result of request to done if request is still current'''
+        if self.running.get(key) is job:  # if request is latest
+            del self.running[key]  # stop showing progress
+            job.view.erase_status(f"HDL_Automation_{job.name}")
+        if job.reason is not None:  # if request has exceeded a budget
+            message = f"HDL_Automation: {job.name} {job.reason}"
+            print(message)
+            sublime.status_message(message)
+        if result is not None:  # if request has succeeded
+            if job.is_current():  # if result belongs to current file content
+                job.trace.lap('dispatch')
+                done(result)
+                job.trace.lap('apply')
+                timings.add(job.trace)
+            elif not job.cancelled and not job.quiet:  # if file has changed while request was running
+                sublime.status_message(f"HDL_Automation: {job.name} discarded, file has changed")
+        if finished is not None:  # if caller waits for end of request
+            finished()
+
+    def progress(self, key, job, frame):
+        '''Animate status bar while request is running'''
+        if self.running.get(key) is job:  # if request is still running
+            job.view.set_status(f"HDL_Automation_{job.name}", f"HDL_Automation: {job.name} {self.frames[frame]}")
+            sublime.set_timeout(lambda: self.progress(key, job, (frame + 1) % len(self.frames)), 100)
+
+    def shutdown(self):
+        '''Stop all requests'''
+        for job in self.running.values():  # for each running request
+            job.cancel()  # stop request
+        self.running.clear()
+        if self.executor is not None:  # if any request has been run
+            self.executor.shutdown(wait=False)  # release threads
+            self.executor = None
+
+
+class HDL_Automation_language_server_error(Exception):
+    '''Raised when language server cannot serve a request'''
+
+
+class HDL_Automation_language_server:
+    '''Long-lived Verible language server speaking JSON-RPC over stdio'''
+
+    timeout = 60  # maximal time in seconds to wait for response
+
+    def __init__(self, process):
+        '''Start language server and initialize it in background'''
+        self.process = tools.popen(
+            process,  # pass process parameters
+            stdin=subprocess.PIPE,  # send requests to stdin
+            stdout=subprocess.PIPE,  # receive responses from stdout
+            stderr=subprocess.DEVNULL,  # ignore server logs
+            bufsize=0  # pass messages without buffering
+        )  # start server directly, so it can be stopped together with its process
+        self.lock = threading.Lock()  # guard stdin against concurrent messages
+        self.ready = False  # True when server has answered initialize request
+        self.queue = []  # messages waiting for server initialization
+        self.counter = 0  # id of last request
+        self.responses = {}  # response event and message by request id
+        self.documents = {}  # change count known by server of each opened document by URI
+        self.versions = {}  # last version sent for each opened document by URI
+        self.outgoing = queue.Queue()  # messages waiting for writer thread, None closes stdin
+        self.reader = threading.Thread(target=self.read, name='HDL_Automation_language_server', daemon=True)
+        self.reader.start()  # receive messages in background
+        self.writer = threading.Thread(target=self.deliver, name='HDL_Automation_language_server', daemon=True)
+        self.writer.start()  # send messages in background, so a busy server never blocks the editor
+        self.call('initialize', {
+            'processId': os.getpid(),
+            'rootUri': None,
+            'capabilities': {
+                'textDocument': {
+                    'synchronization': {'dynamicRegistration': False},
+                    'formatting': {'dynamicRegistration': False},
+                    'rangeFormatting': {'dynamicRegistration': False},
+                    'documentSymbol': {'hierarchicalDocumentSymbolSupport': True},
+                },
+            },
+        })  # initialize server, response is awaited by first request
+
+    @staticmethod
+    def uri(view):
+        '''Return URI of file shown in view'''
+        return pathlib.Path(view.file_name()).as_uri()
+
+    @staticmethod
+    def line_starts(text):
+        '''Return character offset of each line of text'''
+        return [0] + [match.end() for match in re.finditer('\n', text)]
+
+    @staticmethod
+    def offset(text, line_starts, position):
+        '''Convert Language Server Protocol position to character offset of text'''
+        line = position['line']  # get line number
+        if line >= len(line_starts):  # if position is after last line
+            return len(text)
+        start = line_starts[line]  # get offset of line
+        end = line_starts[line + 1] - 1 if line + 1 < len(line_starts) else len(text)  # get offset of line end
+        character = position['character']  # get UTF-16 code unit within line
+        if text[start:end].isascii():  # if code units are characters
+            return min(start + character, end)
+        units = 0  # number of code units before offset
+        for offset in range(start, end):  # for each character of line
+            if units >= character:  # if position has been reached
+                return offset
+            units += 2 if ord(text[offset]) > 0xFFFF else 1  # count code units of character
+        return end
+
+    def alive(self):
+        '''Returns True if server process is running'''
+        return self.process.poll() is None
+
+    def write(self, message):
+        '''Pass message to writer thread, must be called with lock held'''
+        self.outgoing.put(message)
+
+    def deliver(self):
+        '''Serialize and write queued messages to server until stdin is closed'''
+        stdin = self.process.stdin
+        broken = False  # True when server has stopped reading
+        while True:
+            message = self.outgoing.get()  # wait for next message
+            if message is None:  # if server is being stopped
+                break
+            if broken:  # if server has exited
+                continue  # discard message
+            body = json.dumps(message).encode('utf-8')  # serialize message
+            try:  # prevent OSError when server has exited
+                stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+            except OSError:  # if server has exited
+                broken = True
+        try:  # prevent OSError when server has exited
+            stdin.close()  # let server see end of input
+        except OSError:  # if pipe is already broken
+            pass
+
+    def send(self, message):
+        '''Send message or queue it until server is initialized'''
+        with self.lock:  # keep messages in order
+            if self.ready or message.get('method') == 'initialize':  # if server accepts messages
+                self.write(message)
+            else:  # if server is not initialized yet
+                self.queue.append(message)
+
+    def call(self, method, params):
+        '''Send request and return its id'''
+        with self.lock:  # prevent duplicated ids
+            self.counter += 1
+            request_id = self.counter
+            self.responses[request_id] = [threading.Event(), None]  # prepare place for response
+        self.send({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params})
+        return request_id
+
+    def notify(self, method, params):
+        '''Send notification'''
+        self.send({'jsonrpc': '2.0', 'method': method, 'params': params})
+
+    def request(self, job, method, params):
+        '''Send request and wait for its result, raise HDL_Automation_cancelled when job is cancelled'''
+        request_id = self.call(method, params)
+        event, message = self.responses[request_id]
+        waited = 0  # time spent on waiting
+        while not event.wait(0.1):  # while response has not arrived
+            waited += 0.1
+            if job is not None and job.cancelled:  # if newer request has arrived
+                self.notify('$/cancelRequest', {'id': request_id})  # stop server work
+                del self.responses[request_id]
+                raise HDL_Automation_cancelled()
+            if not self.alive() or waited > self.timeout:  # if server will not respond
+                del self.responses[request_id]
+                raise HDL_Automation_language_server_error(f"no response to `{method}`")
+        message = self.responses.pop(request_id)[1]  # get response
+        if 'error' in message:  # if server has failed
+            raise HDL_Automation_language_server_error(message['error'].get('message'))
+        return message.get('result')
+
+    def read(self):
+        '''Receive messages from server until it exits'''
+        stdout = self.process.stdout
+        while True:
+            length = None  # length of message body
+            while True:  # for each header line
+                line = stdout.readline()
+                if not line:  # if server has exited
+                    return
+                line = line.strip()
+                if not line:  # if headers have ended
+                    break
+                name, _, value = line.partition(b':')
+                if name.strip().lower() == b'content-length':  # if header gives body length
+                    length = int(value)
+            if length is None:  # if message is malformed
+                continue
+            body = b''
+            while len(body) < length:  # until whole body is received
+                chunk = stdout.read(length - len(body))
+                if not chunk:  # if server has exited
+                    return
+                body += chunk
+            self.receive(json.loads(body.decode('utf-8')))
+
+    def receive(self, message):
+        '''Dispatch message received from server'''
+        if 'method' in message:  # if message is a request or notification from server
+            if 'id' in message:  # if server waits for response
+                self.send({'jsonrpc': '2.0', 'id': message['id'], 'result': None})  # accept request
+            return
+        response = self.responses.get(message.get('id'))  # get place for response
+        if response is None:  # if request has been abandoned
+            return
+        response[1] = message
+        if message.get('id') == 1 and not self.ready:  # if it is a response to initialize request
+            with self.lock:  # send queued messages in order
+                self.ready = True
+                self.write({'jsonrpc': '2.0', 'method': 'initialized', 'params': {}})
+                for queued in self.queue:  # for each message sent before initialization
+                    self.write(queued)
+                self.queue.clear()
+            del self.responses[1]  # nobody waits for initialize response
+        else:
+            response[0].set()  # wake up waiting request
+
+    def version(self, uri):
+        '''Return next document version, always greater than the last one sent'''
+        self.versions[uri] = self.versions.get(uri, 0) + 1
+        return self.versions[uri]
+
+    def sync(self, view, text):
+        '''Send text of view when server does not know its current state'''
+        uri = self.uri(view)
+        change_count = view.change_count()  # get buffer state
+        if uri not in self.documents:  # if document is not opened
+            self.notify('textDocument/didOpen', {
+                'textDocument': {'uri': uri, 'languageId': 'systemverilog', 'version': self.version(uri), 'text': text}
+            })
+        elif self.documents[uri] != change_count:  # if document has missed some changes
+            self.notify('textDocument/didChange', {
+                'textDocument': {'uri': uri, 'version': self.version(uri)},
+                'contentChanges': [{'text': text}]
+            })
+        self.documents[uri] = change_count
+
+    def changed(self, view, changes, change_count):
+        '''Send incremental changes of opened document, change_count is buffer state after changes'''
+        uri = self.uri(view)
+        if uri in self.documents and self.documents[uri] != change_count:  # if server does not know changes yet
+            self.notify('textDocument/didChange', {
+                'textDocument': {'uri': uri, 'version': self.version(uri)},
+                'contentChanges': [{
+                    'range': {
+                        'start': {'line': change.a.row, 'character': change.a.col_utf16},
+                        'end': {'line': change.b.row, 'character': change.b.col_utf16},
+                    },
+                    'text': change.str,
+                } for change in changes]
+            })
+            self.documents[uri] = change_count  # remember buffer state known by server
+
+    def closed(self, view):
+        '''Close document of closed view'''
+        uri = self.uri(view)
+        self.versions.pop(uri, None)  # versions of reopened document start again
+        if self.documents.pop(uri, None) is not None:  # if server tracks document
+            self.notify('textDocument/didClose', {'textDocument': {'uri': uri}})
+
+    def format(self, job, text, line_ranges):
+        '''Return text formatted by server, line_ranges may hold a single 1-based N-M range'''
+        uri = self.uri(job.view)
+        options = {'tabSize': 2, 'insertSpaces': True}  # indentation is converted to tabs afterwards
+        if line_ranges:  # if user select specific lines to format
+            first, last = line_ranges.split('-')  # get first and last selected line
+            edits = self.request(job, 'textDocument/rangeFormatting', {
+                'textDocument': {'uri': uri},
+                'range': {
+                    'start': {'line': int(first) - 1, 'character': 0},
+                    'end': {'line': int(last), 'character': 0},
+                },
+                'options': options,
+            })
+        else:  # if whole file is formatted
+            edits = self.request(job, 'textDocument/formatting', {'textDocument': {'uri': uri}, 'options': options})
+        line_starts = self.line_starts(text)  # get offset of each line
+        edits = [(
+            self.offset(text, line_starts, edit['range']['start']),
+            self.offset(text, line_starts, edit['range']['end']),
+            edit['newText']
+        ) for edit in edits or ()]  # convert edit ranges to character offsets
+        edits.sort(key=lambda edit: edit[0], reverse=True)  # apply edits from the last one
+        for start, end, new_text in edits:  # for each edit
+            text = text[:start] + new_text + text[end:]
+        return text
+
+    def symbols(self, job):
+        '''Return document symbols of view'''
+        return self.request(job, 'textDocument/documentSymbol', {'textDocument': {'uri': self.uri(job.view)}})
+
+    def shutdown(self):
+        '''Stop server without waiting for it'''
+        if self.alive():  # if server is running
+            self.call('shutdown', None)  # ask server to finish its work
+            self.notify('exit', None)  # ask server to exit
+            threading.Thread(target=self.stop, name='HDL_Automation_language_server', daemon=True).start()
+        with self.lock:  # close stdin after queued messages
+            self.write(None)
+
+    def stop(self):
+        '''Wait in background for server to exit and kill it when it does not'''
+        try:  # prevent TimeoutExpired
+            self.process.wait(1)  # let server exit
+        except subprocess.TimeoutExpired:  # if server does not exit
+            self.process.kill()  # stop server
+
+
+class HDL_Automation_language_servers:
+    '''Keep one language server per window'''
+
+    def __init__(self):
+        '''Create empty set of servers'''
+        self.servers = {}  # server and its parameters by window id
+
+    def get(self, view, process):
+        '''Return running server of view window, restarted when its parameters change, or None'''
+        window = view.window()  # get window of current view
+        if window is None:  # if view is not shown
+            return None
+        server, previous = self.servers.get(window.id(), (None, None))  # get running server and its parameters
+        if server is not None and (previous != process or not server.alive()):  # if server is outdated
+            server.shutdown()  # stop outdated server
+            server = None
+        if server is None:  # if window has no running server
+            try:  # prevent OSError
+                server = HDL_Automation_language_server(process)  # start server
+            except (OSError, HDL_Automation_missing_tool) as err:  # if server cannot be started
+                print(f"HDL_Automation: Language server could not be started, `{err}`")
+                self.servers.pop(window.id(), None)
+                return None
+            self.servers[window.id()] = (server, process)
+        return server
+
+    def changed(self, view, changes, change_count):
+        '''Pass changes of view to servers'''
+        for server, process in self.servers.values():  # for each running server
+            server.changed(view, changes, change_count)
+
+    def closed(self, view):
+        '''Pass closing of view to servers'''
+        for server, process in self.servers.values():  # for each running server
+            server.closed(view)
+
+    def shutdown(self, window_id=None):
+        '''Stop server of window or all servers'''
+        for key in list(self.servers):  # for each window with server
+            if window_id is None or key == window_id:  # if server should be stopped
+                self.servers.pop(key)[0].shutdown()
+
+
+class HDL_Automation_dirty_lines:
+    '''Track regions of each buffer edited since it has been formatted'''
+
+    limit = 256  # maximal number of separate regions, more are merged
+
+    def __init__(self):
+        '''Create empty tracker'''
+        self.regions = {}  # sorted, disjoint [start, end] character regions by buffer id
+        self.clean = {}  # change count of last format by buffer id
+
+    def changed(self, buffer_id, changes, change_count):
+        '''Move regions behind changes and add changed regions, change_count is buffer state after changes'''
+        if change_count is not None and change_count == self.clean.get(buffer_id):  # if changes are made by format
+            return
+        regions = self.regions.get(buffer_id, [])
+        for change in changes:  # for each change in order
+            begin, end = change.a.pt, change.b.pt  # get replaced region before change
+            delta = len(change.str) - (end - begin)  # get shift of following text
+            merged = [begin, begin + len(change.str)]  # region of inserted text
+            updated = []  # regions after change
+            for region in regions:  # for each edited region
+                if region[1] < begin:  # if region is before change
+                    updated.append(region)
+                elif region[0] > end:  # if region is after change
+                    updated.append([region[0] + delta, region[1] + delta])
+                else:  # if region touches change
+                    merged = [min(merged[0], region[0]), max(merged[1], region[1] + delta)]
+            updated.append(merged)
+            updated.sort()
+            if len(updated) > self.limit:  # if too many regions are tracked
+                updated = [[updated[0][0], updated[-1][1]]]  # treat everything between as edited
+            regions = updated
+        self.regions[buffer_id] = regions
+
+    def get(self, view):
+        '''Return edited regions of view as (start, end) tuples'''
+        return [tuple(region) for region in self.regions.get(view.buffer_id(), ())]
+
+    def formatted(self, view):
+        '''Forget edited regions of freshly formatted view'''
+        self.regions.pop(view.buffer_id(), None)
+        self.clean[view.buffer_id()] = view.change_count()  # ignore changes made by format
+
+    def discard(self, buffer_id):
+        '''Forget closed buffer'''
+        self.regions.pop(buffer_id, None)
+        self.clean.pop(buffer_id, None)
+
+
+class HDL_Automation_text_listener(sublime_plugin.TextChangeListener):
+    '''Pass buffer changes to language servers'''
+
+    @classmethod
+    def is_applicable(cls, buffer):
+        '''Returns True if buffer holds Verilog or SystemVerilog file'''
+        file_name = buffer.file_name()  # get current file path
+        if file_name is not None:  # check if path is an existing regular file
+            path_root, path_ext = os.path.splitext(file_name)  # split the current file path into root and extension
+            return path_ext.lower() in ['.v', '.vh', '.sv', '.svh']
+        return False
+
+    def on_text_changed(self, changes):
+        '''Called when buffer has changed'''
+        buffer_id = self.buffer.id()  # get id of changed buffer
+        view = self.buffer.primary_view()  # get view of buffer
+        change_count = view.change_count() if view is not None else None  # get buffer state after changes
+        trackers = [
+            lambda: dirty_lines.changed(buffer_id, changes, change_count),  # remember edited regions
+            lambda: scope_scanner.changed(buffer_id, changes),  # forget scanned scopes after edit
+            lambda: live_trees.changed(buffer_id, changes),  # log edits made since last parse
+        ]
+        if view is not None and view.file_name() is not None:  # if buffer is shown and has file path
+            trackers.append(lambda: language_servers.changed(view, changes, change_count))
+        for tracker in trackers:  # for each tracker of changes
+            try:  # prevent failure of one tracker from hiding changes from the others
+                tracker()
+            except Exception as err:  # if tracker has failed unexpectedly
+                print(f"HDL_Automation: Tracking changes failed with `{err}`")
+
+
+class HDL_Automation_format_cache:
+    '''Remember on disk which file contents are already formatted with which settings'''
+
+    limit = 10000  # maximal number of remembered files
+
+    def __init__(self):
+        '''Create cache which is loaded on first use'''
+        self.entries = None  # content hash and settings fingerprint by file path, least recently used first
+        self.saving = False  # True when writing cache to disk is scheduled
+
+    def path(self):
+        '''Return path of cache file'''
+        return os.path.join(sublime.cache_path(), 'HDL_Automation', 'format_cache.json')
+
+    def load(self):
+        '''Read cache file once'''
+        if self.entries is None:  # if cache has not been read
+            self.entries = collections.OrderedDict()
+            try:  # prevent missing or damaged cache file
+                with open(self.path(), 'r', encoding='utf-8') as file:  # read cache file
+                    self.entries.update(json.load(file))
+            except (OSError, ValueError):  # if cache file cannot be read
+                pass
+
+    def save(self):
+        '''Write cache file'''
+        self.saving = False
+        try:  # prevent OSError
+            os.makedirs(os.path.dirname(self.path()), exist_ok=True)  # create cache folder
+            with open(self.path(), 'w', encoding='utf-8') as file:  # write cache file
+                json.dump(self.entries, file)
+        except OSError as err:  # if cache file cannot be written
+            print(f"HDL_Automation: Format cache could not be written, `{err}`")
+
+    @staticmethod
+    def digest(content):
+        '''Return hash of byte string content'''
+        return hashlib.sha1(content).hexdigest()
+
+    def get(self, file_name):
+        '''Return content hash and settings fingerprint of last formatted output of file'''
+        self.load()
+        entry = self.entries.get(os.path.normcase(file_name))
+        return tuple(entry) if entry is not None else (None, None)
+
+    def put(self, file_name, digest, fingerprint):
+        '''Remember content hash of formatted output of file together with settings fingerprint'''
+        self.load()
+        key = os.path.normcase(file_name)
+        self.entries.pop(key, None)
+        self.entries[key] = [digest, fingerprint]  # remember file as most recently formatted
+        while len(self.entries) > self.limit:  # while cache is too big
+            self.entries.popitem(last=False)  # forget least recently formatted file
+        if not self.saving:  # if writing is not scheduled yet
+            self.saving = True
+            sublime.set_timeout(self.save, 1000)  # write cache once after many saves
+
+
+class HDL_Automation_save_queue:
+    '''Format saved files a few at a time'''
+
+    def __init__(self):
+        '''Create empty queue'''
+        self.pending = collections.OrderedDict()  # views waiting for format by view id
+        self.active = set()  # ids of views being formatted
+
+    def limit(self):
+        '''Return maximal number of files formatted at once'''
+        return min(4, os.cpu_count() or 1)
+
+    def put(self, view):
+        '''Format view after it is saved, a view which is already waiting is queued once'''
+        if view.id() not in self.active:  # if view is not being formatted
+            self.pending[view.id()] = view
+        sublime.set_timeout(self.next)  # start formatting after save has finished
+
+    def next(self):
+        '''Start formatting waiting views while limit allows'''
+        while self.pending and len(self.active) < self.limit():  # while any view waits and limit allows
+            view_id, view = self.pending.popitem(last=False)  # get view which waits longest
+            if view.is_valid():  # if view is still open
+                self.active.add(view_id)
+                view.run_command('format', {'save': True})  # format and save view
+
+    def finished(self, view):
+        '''Start next view when formatting of view has finished'''
+        self.active.discard(view.id())
+        self.next()
+
+
+class HDL_Automation_linter:
+    '''Lint edited files in background a few at a time and remember findings of each file content'''
+
+    limit = 256  # maximal number of remembered file contents
+    # finding reported by Verible Linter as line, column, optional end column and message
+    pattern = re.compile(r'^.*?:(\d+):(\d+)(?:-(\d+))?:\s*(.*)$', re.M)
+
+    def __init__(self):
+        '''Create empty linter'''
+        self.generations = {}  # number of edits by view id, used to debounce edits
+        self.linted = {}  # hash of last shown content by view id
+        self.findings = collections.OrderedDict()  # findings by content hash, least recently used first
+        self.lock = threading.Lock()  # guard findings against concurrent update from background requests
+        self.pending = collections.OrderedDict()  # views waiting for lint with content, hash and change count by id
+        self.active = set()  # ids of views being linted
+
+    def concurrency(self):
+        '''Return maximal number of files linted at once'''
+        return min(2, os.cpu_count() or 1)
+
+    def modified(self, view, delay=None):
+        '''Lint view when it has not been edited for a while'''
+        config = settings.snapshot()  # get settings
+        if not config.lint or policy.strategy(view, config) == 'tokens':  # if lint is disabled or file is too large
+            if view.id() in self.linted:  # if findings are still shown
+                self.clear(view)
+            return
+        generation = self.generations.get(view.id(), 0) + 1  # count edit
+        self.generations[view.id()] = generation
+        sublime.set_timeout_async(
+            lambda: self.idle(view, generation),  # lint view unless edited again
+            config.lint_delay if delay is None else delay
+        )
+
+    def idle(self, view, generation):
+        '''Lint view if it has not been edited since generation'''
+        if self.generations.get(view.id()) != generation or not view.is_valid():  # if view is edited or closed
+            return
+        change_count = view.change_count()  # get buffer state of content
+        content = policy.content(view)  # get file content
+        digest = hashlib.sha1(content).hexdigest()  # get hash of file content
+        if self.linted.get(view.id()) == digest:  # if findings of content are already shown
+            return
+        with self.lock:  # prevent concurrent update
+            findings = self.findings.get(digest)
+            if findings is not None:  # if content has been linted before
+                self.findings.move_to_end(digest)  # mark content as recently used
+        if findings is not None:  # if findings are known
+            # show findings without linting
+            sublime.set_timeout(lambda: self.show(view, digest, findings, change_count))
+        else:  # if content is new
+            sublime.set_timeout(lambda: self.put(view, content, digest, change_count))  # lint content
+
+    def put(self, view, content, digest, change_count):
+        '''Lint content of view read at change count when limit allows, a view which is already waiting is queued
+        once'''
+        if view.id() in self.active:  # if older content of view is being linted
+            self.pending.pop(view.id(), None)  # lint newest content once older request has finished
+        self.pending[view.id()] = (view, content, digest, change_count)
+        self.next()
+
+    def next(self):
+        '''Start linting waiting views while limit allows'''
+        for view_id, (view, content, digest, change_count) in list(self.pending.items()):  # for each waiting view
+            if len(self.active) >= self.concurrency():  # if limit is reached
+                break
+            if view_id in self.active:  # if view is being linted
+                continue
+            del self.pending[view_id]
+            # if view is still open and content is current, otherwise edit has scheduled newer content
+            if view.is_valid() and view.change_count() == change_count:
+                self.active.add(view_id)
+                self.run(view, content, digest, change_count)
+
+    def run(self, view, content, digest, change_count):
+        '''Lint content of view in background'''
+        config = settings.snapshot()  # get settings
+        jobs.submit(
+            view,
+            'Lint',
+            lambda job: self.lint(job, config.lint_process, content, digest),
+            lambda findings: self.show(view, digest, findings, change_count),
+            lambda: self.finished(view),
+            quiet=True  # edits during lint are expected
+        )
+
+    def lint(self, job, process, content, digest):
+        '''Run Verible Linter and remember findings of content'''
+        output = job.communicate(process, content).decode('utf-8', 'replace')  # get Verible Linter report
+        findings = tuple(
+            (int(line) - 1, int(column) - 1, int(end) - 1 if end else None, message)  # use 0-based positions
+            for line, column, end, message in self.pattern.findall(output)
+        )
+        job.trace.lap('parse')
+        with self.lock:  # prevent concurrent update
+            self.findings[digest] = findings  # remember findings even if file has changed meanwhile
+            while len(self.findings) > self.limit:  # while cache is too big
+                self.findings.popitem(last=False)  # forget least recently linted content
+        return findings
+
+    def finished(self, view):
+        '''Start next view when linting of view has finished'''
+        self.active.discard(view.id())
+        self.next()
+
+    def show(self, view, digest, findings, change_count):
+        '''Annotate findings of content read at change count in view if it has not changed since'''
+        if not view.is_valid() or view.change_count() != change_count:  # if view is closed or has changed meanwhile
+            return
+        self.linted[view.id()] = digest  # remember shown content
+        errors = ([], [])  # regions and annotations of syntax errors
+        warnings = ([], [])  # regions and annotations of lint findings
+        for line, column, end, message in findings:  # for each finding
+            point = view.text_point(line, column)  # get start of finding
+            if end is not None:  # if finding has known width
+                region = sublime.Region(point, view.text_point(line, end))
+            else:  # if finding marks a token
+                region = view.word(point)
+                if region.empty() or not region.contains(point):  # if finding is not inside a word
+                    region = sublime.Region(point, min(point + 1, view.size()))  # mark single character
+            target = errors if 'syntax error' in message else warnings  # get kind of finding
+            target[0].append(region)
+            target[1].append(message.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;'))
+        flags = sublime.DRAW_SQUIGGLY_UNDERLINE | sublime.DRAW_NO_FILL | sublime.DRAW_NO_OUTLINE
+        for key, scope, (regions, annotations) in [
+            ('HDL_Automation_lint_errors', 'region.redish', errors),
+            ('HDL_Automation_lint_warnings', 'region.yellowish', warnings),
+        ]:  # for each kind of finding
+            view.add_regions(key, regions, scope, flags=flags, annotations=annotations)
+        count = len(errors[0]) + len(warnings[0])  # get number of findings
+        view.set_status('HDL_Automation_Lint_findings', f"Lint: {count}" if count else '')
+
+    def clear(self, view):
+        '''Remove findings and state of view'''
+        self.generations.pop(view.id(), None)
+        self.linted.pop(view.id(), None)
+        self.pending.pop(view.id(), None)
+        view.erase_regions('HDL_Automation_lint_errors')
+        view.erase_regions('HDL_Automation_lint_warnings')
+        view.erase_status('HDL_Automation_Lint_findings')
+
+
+class HDL_Automation_listener(sublime_plugin.EventListener):
+    '''Keep HDL_Automation state in sync with views'''
+
+    def on_close(self, view):
+        '''Called when a view is closed'''
+        syntax_tree_cache.discard(view.buffer_id())  # forget state of closed buffer
+        linter.clear(view)  # forget findings of closed view
+        dirty_lines.discard(view.buffer_id())  # forget edits of closed buffer
+        scope_scanner.discard(view.buffer_id())  # forget scanned scopes of closed buffer
+        live_trees.discard(view.buffer_id())  # forget last syntax tree of closed buffer
+        scope_status.discard(view)  # forget scheduled parse of closed view
+        if view.file_name() is not None:  # if view has file path
+            language_servers.closed(view)  # close document in language servers
+
+    def on_pre_save(self, view):
+        '''Called just before a view is saved'''
+        file_name = view.file_name()  # get current file path
+        if file_name is not None:  # check if path is an existing regular file
+            path_root, path_ext = os.path.splitext(file_name)  # split the current file path into root and extension
+            # if file extension is an Verilog or SystemVerilog extension
+            if path_ext.lower() in ['.v', '.vh', '.sv', '.svh']:
+                config = settings.snapshot()  # get settings
+                if config.format_on_save:  # if user wants to format on save
+                    content = view.substr(sublime.Region(0, view.size())).encode()  # get file content
+                    # if content is not known as formatted with current settings
+                    if format_cache.get(file_name) != (format_cache.digest(content), config.fingerprint):
+                        save_queue.put(view)  # format file after saving
+
+    def on_post_save_async(self, view):
+        '''Called after a view has been saved'''
+        file_name = view.file_name()  # get current file path
+        if file_name is not None:  # check if path is an existing regular file
+            path_root, path_ext = os.path.splitext(file_name)  # split the current file path into root and extension
+            # if file extension is an Verilog or SystemVerilog extension
+            if path_ext.lower() in ['.v', '.vh', '.sv', '.svh']:
+                module_indexes.saved(view)  # update saved file in module index
+
+    def on_modified_async(self, view):
+        '''Called after changes have been made to a view'''
+        if self.is_hdl(view):  # if view holds Verilog or SystemVerilog file
+            linter.modified(view)  # lint file once edits pause
+
+    def on_load_async(self, view):
+        '''Called when the file is finished loading'''
+        if self.is_hdl(view):  # if view holds Verilog or SystemVerilog file
+            linter.modified(view, 0)  # lint opened file
+
+    def on_activated_async(self, view):
+        '''Called when a view gains input focus'''
+        if self.is_hdl(view):  # if file is Verilog or SystemVerilog
+            tools.warm_up(settings.snapshot())  # start Windows Subsystem for Linux before first command
+        if self.is_hdl(view) and view.id() not in linter.linted:  # if file has not been linted yet
+            linter.modified(view, 0)  # lint file
+
+    def on_selection_modified(self, view):
+        '''Called after the selection has been modified in a view'''
+        if self.is_hdl(view):  # if view holds Verilog or SystemVerilog file
+            scope_status.update(view, settings.snapshot())  # show scopes enclosing first cursor
+
+    def on_post_text_command(self, view, command_name, args):
+        '''Called after a text command has been executed'''
+        # if content may have returned to an already linted state
+        if command_name in ['undo', 'redo', 'redo_or_repeat', 'soft_undo', 'soft_redo'] and self.is_hdl(view):
+            linter.modified(view, 0)  # show remembered findings without waiting
+
+    @staticmethod
+    def is_hdl(view):
+        '''Returns True if view holds Verilog or SystemVerilog file'''
+        file_name = view.file_name()  # get current file path
+        if file_name is not None:  # check if path is an existing regular file
+            path_root, path_ext = os.path.splitext(file_name)  # split the current file path into root and extension
+            return path_ext.lower() in ['.v', '.vh', '.sv', '.svh']
+        return False
+
+    def on_pre_close_window(self, window):
+        '''Called when a window is about to be closed'''
+        language_servers.shutdown(window.id())  # stop language server of window
+
+
+def plugin_loaded():
+    '''Called when plugin is loaded'''
+    settings.load()  # validate settings once
+    tools.resolve(settings.snapshot())  # find Verible executables in background
+
+
+def plugin_unloaded():
+    '''Called when plugin is unloaded'''
+    settings.unload()  # stop listening to settings changes
+    jobs.shutdown()  # stop background requests
+    language_servers.shutdown()  # stop language servers
+    for batch in list(batches.values()):  # for each running Format Files batch
+        batch.cancel()  # stop formatting files
+    if format_cache.saving:  # if format cache has not been written yet
+        format_cache.save()  # write format cache
+    module_indexes.close()  # close module indexes
+
 
 settings = HDL_Automation_settings()
+policy = HDL_Automation_policy()
+syntax_tree_cache = HDL_Automation_syntax_tree_cache()
+jobs = HDL_Automation_jobs()
+language_servers = HDL_Automation_language_servers()
+batches = {}  # running Format Files batch by window id
+format_cache = HDL_Automation_format_cache()
+save_queue = HDL_Automation_save_queue()
+module_indexes = HDL_Automation_module_indexes()
+linter = HDL_Automation_linter()
+timings = HDL_Automation_timings()
+dirty_lines = HDL_Automation_dirty_lines()
+tools = HDL_Automation_tools()
+scope_scanner = HDL_Automation_scope_scanner()
+live_trees = HDL_Automation_live_trees()
+scope_status = HDL_Automation_scope_status()
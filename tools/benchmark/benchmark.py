@@ -0,0 +1,262 @@
+#######################################################################################################################
+# HDL_Automation - Verilog and SystemVerilog automation with Sublime Text 4                                           #
+# Copyright (C) 2021  Dawid Szulc                                                                                     #
+#                                                                                                                     #
+# This program is free software: you can redistribute it and/or modify                                                #
+# it under the terms of the GNU General Public License as published by                                                #
+# the Free Software Foundation, either version 3 of the License, or                                                   #
+# (at your option) any later version.                                                                                 #
+#                                                                                                                     #
+# This program is distributed in the hope that it will be useful,                                                     #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of                                                      #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                                                       #
+# GNU General Public License for more details.                                                                        #
+#                                                                                                                     #
+# You should have received a copy of the GNU General Public License                                                   #
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.                                              #
+#######################################################################################################################
+
+'''Measure how Format and Scope Name scale with file size
+
+Usage: python benchmark.py [--sizes 1000,10000,50000] [--runs 20] [--cursors 64] [--depth 4] [--ports 32]
+                           [--recordings DIR] [--record] [--json FILE]
+
+For each size a synthetic SystemVerilog file is generated (see corpus.py) and the commands are run end to end
+against mocked sublime modules (see mock_sublime.py): from running the command, through the background request,
+to the popup or the applied edit on the main thread. Verible is replaced by fake_verible.py, which replays
+recordings written by the generator, or recorded from the real Verible with --record. Recordings are keyed by
+file content only, so selection formatting replays whole file output.
+
+Printed are latency percentiles of each command, the median of each phase and the peak Python memory of a
+single run, measured separately so tracing does not distort latencies.'''
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path[:0] = [os.path.dirname(os.path.abspath(__file__)), os.path.join(os.path.dirname(__file__), '..', '..')]
+
+import corpus
+import mock_sublime
+
+mock_sublime.install()
+
+import HDL_Automation
+
+
+class Phases:
+    '''Collect durations of plugin phases'''
+
+    def __init__(self):
+        self.durations = {}  # durations in seconds by phase name
+        self.lock = threading.Lock()  # phases run on main and background threads
+
+    def wrap(self, owner, attribute, name, wrapper=staticmethod):
+        '''Replace function of owner by one which records its duration as phase name'''
+        function = getattr(owner, attribute)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - start)
+
+        setattr(owner, attribute, wrapper(timed) if wrapper is not None else timed)
+
+    def add(self, name, duration):
+        with self.lock:
+            self.durations.setdefault(name, []).append(duration)
+
+    def take(self):
+        '''Return and forget collected durations'''
+        with self.lock:
+            durations, self.durations = self.durations, {}
+        return durations
+
+
+def percentile(values, percent):
+    '''Return nearest rank percentile of values'''
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, math.ceil(percent / 100 * len(values)) - 1))]
+
+
+def install_fakes(folder):
+    '''Put fake Verible executables in front of PATH'''
+    os.makedirs(folder, exist_ok=True)
+    fake = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_verible.py')
+    for tool in ['syntax', 'format']:
+        if os.name == 'nt':
+            path = os.path.join(folder, f"verible-verilog-{tool}.cmd")
+            script = f'@"{sys.executable}" "{fake}" {tool} %*\r\n'
+        else:
+            path = os.path.join(folder, f"verible-verilog-{tool}")
+            script = f'#!/bin/sh\nexec "{sys.executable}" "{fake}" {tool} "$@"\n'
+        with open(path, 'w', newline='') as file:
+            file.write(script)
+        os.chmod(path, 0o755)
+    os.environ['PATH'] = folder + os.pathsep + os.environ['PATH']
+
+
+def record(folder, tool, content, output, real):
+    '''Store output of tool for content, taken from the real Verible when real is True'''
+    if real:
+        config = HDL_Automation.settings.snapshot()
+        process = config.syntax_process if tool == 'syntax' else config.format_process
+        output = subprocess.run(process, input=content, stdout=subprocess.PIPE, check=True).stdout
+    os.makedirs(os.path.join(folder, tool), exist_ok=True)
+    with open(os.path.join(folder, tool, hashlib.sha1(content).hexdigest()), 'wb') as file:
+        file.write(output)
+
+
+def construct(text, formatted, tree, cursor):
+    '''Return current and formatted lines of top level construct enclosing cursor'''
+    for declaration in tree['-']['tree']['children']:
+        leaves = [declaration]
+        while 'children' in leaves[-1]:  # find last leaf
+            leaves.append(leaves[-1]['children'][-1])
+        first = declaration
+        while 'children' in first:  # find first leaf
+            first = first['children'][0]
+        if first['start'] <= cursor <= leaves[-1]['end']:
+            begin = text.count('\n', 0, first['start'])
+            end = text.count('\n', 0, leaves[-1]['end']) + 1
+            lines = text.splitlines(True)
+            formatted_lines = formatted.splitlines(True)
+            return ''.join(lines[begin:end]), ''.join(formatted_lines[begin:end])
+    return '', ''
+
+
+def run(command, view, name):
+    '''Run text command and wait until its background request has finished, return latency in seconds'''
+    start = time.perf_counter()
+    view.run_command(command)
+    key = (view.id(), name)
+    resumes = HDL_Automation.ScopeNameCommand.resumes  # scans of large files continued in slices
+    mock_sublime.scheduler.pump(lambda: key not in HDL_Automation.jobs.running and view.id() not in resumes)
+    view.content()  # apply pending replacements, as Sublime Text does at once
+    return time.perf_counter() - start
+
+
+def scenarios(path, text, cursors):
+    '''Return name, command, job name, view factory and settings of each measured scenario'''
+    def view(selections=None):
+        view = mock_sublime.View(path, text)
+        if selections:
+            view.selection[:] = selections
+        return view
+
+    def cold(selections):
+        HDL_Automation.syntax_tree_cache.trees.clear()  # forget parsed trees
+        HDL_Automation.syntax_tree_cache.buffers.clear()
+        HDL_Automation.syntax_tree_cache.size = 0
+        return view(selections)
+
+    warm = view([mock_sublime.Region(cursor) for cursor in cursors])
+    points = [mock_sublime.Region(cursor) for cursor in cursors]
+    ranges = [mock_sublime.Region(cursor, cursor + 8) for cursor in cursors]
+    edit = [points[len(points) // 2]]  # cursor inside a single construct
+    return [
+        ('Scope Name', 'scope_name', 'Scope Name', lambda: cold(points), {}),
+        ('Scope Name cached', 'scope_name', 'Scope Name', lambda: warm, {}),
+        ('Scope Name Verible', 'scope_name', 'Scope Name', lambda: cold(points), {'scope_scanner': 'false'}),
+        ('Format', 'format', 'Format', lambda: view(), {}),
+        ('Format selections', 'format', 'Format', lambda: view(ranges), {}),
+        ('Format partial', 'format', 'Format', lambda: view(edit), {'partial_format': 'true'}),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HDL_Automation Format and Scope Name')
+    parser.add_argument('--sizes', default='1000,10000,50000', help='comma-separated file sizes in lines')
+    parser.add_argument('--runs', type=int, default=20, help='measured runs of each command')
+    parser.add_argument('--cursors', type=int, default=64, help='number of cursors or selections')
+    parser.add_argument('--depth', type=int, default=4, help='depth of nested module declarations')
+    parser.add_argument('--ports', type=int, default=32, help='maximal number of ports of a module')
+    parser.add_argument('--recordings', help='folder of recorded Verible output, temporary by default')
+    parser.add_argument('--record', action='store_true', help='record output of the real Verible found in PATH')
+    parser.add_argument('--json', help='write results to JSON file')
+    args = parser.parse_args()
+
+    settings = mock_sublime.load_settings('HDL_Automation.sublime-settings')
+    settings.values['windows_subsystem_for_linux'] = 'false'  # run Verible directly
+    settings.values['language_server'] = 'false'  # measure subprocess path
+    if args.record and not shutil.which('verible-verilog-syntax'):
+        parser.error('--record requires Verible in PATH')
+
+    work = tempfile.mkdtemp(prefix='HDL_Automation_benchmark_')
+    recordings = args.recordings or os.path.join(work, 'recordings')
+    phases = Phases()
+    phases.wrap(HDL_Automation.HDL_Automation_job, 'communicate', 'subprocess', None)
+    phases.wrap(HDL_Automation.HDL_Automation_scope_tree, 'from_printtree', 'syntax tree')
+    phases.wrap(HDL_Automation.HDL_Automation_scope_scanner, 'scan', 'scanner', None)
+    phases.wrap(HDL_Automation.ScopeNameCommand, 'show', 'popup', None)
+    phases.wrap(HDL_Automation.FormatCommand, 'convert', 'convert')
+    phases.wrap(HDL_Automation.FormatApplyCommand, 'get_hunks', 'diff', None)
+    phases.wrap(HDL_Automation.FormatApplyCommand, 'run', 'apply', None)
+
+    if not args.record:  # if Verible should be replayed
+        install_fakes(os.path.join(work, 'bin'))
+    os.environ['HDL_AUTOMATION_RECORDINGS'] = recordings
+    HDL_Automation.plugin_loaded()
+    while HDL_Automation.tools.wsl is None:  # wait until executables are resolved in background
+        time.sleep(0.01)
+
+    results = []
+    try:
+        for lines in [int(size) for size in args.sizes.split(',')]:
+            text, formatted, tree, cursors = corpus.generate(lines, depth=args.depth, ports=args.ports,
+                                                             cursors=args.cursors)
+            content = text.encode()
+            record(recordings, 'syntax', content, corpus.printtree(tree['-']['tree']).encode(), args.record)
+            record(recordings, 'format', content, formatted.encode(), args.record)
+            current, formatted = construct(text, formatted, tree, cursors[len(cursors) // 2])  # edited construct
+            record(recordings, 'format', current.encode(), formatted.encode(), args.record)
+            path = os.path.join(work, f"corpus_{lines}.sv")
+            print(f"\n{lines} lines, {len(content) / 1024 / 1024:.2f} MiB, {len(cursors)} cursors")
+            print(f"{'command':<20}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'peak MiB':>10}  phases p50 ms")
+            for name, command, job, factory, overrides in scenarios(path, text, cursors):
+                defaults = {key: settings.get(key) for key in overrides}
+                for key, value in overrides.items():
+                    settings.set(key, value)
+                run(command, factory(), job)  # warm up
+                phases.take()
+                latencies = [run(command, factory(), job) for _ in range(args.runs)]
+                durations = phases.take()
+                view = factory()
+                tracemalloc.start()
+                run(command, view, job)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                phases.take()
+                for key, value in defaults.items():
+                    settings.set(key, value)
+                medians = {phase: percentile(values, 50) for phase, values in durations.items()}
+                print(
+                    f"{name:<20}" + ''.join(f"{percentile(latencies, p) * 1000:>10.1f}" for p in [50, 90, 99, 100])
+                    + f"{peak / 1024 / 1024:>10.1f}  "
+                    + ', '.join(f"{phase} {duration * 1000:.1f}" for phase, duration in medians.items())
+                )
+                results.append({
+                    'lines': lines, 'bytes': len(content), 'command': name, 'latencies': latencies,
+                    'phases': medians, 'peak_memory': peak,
+                })
+    finally:
+        HDL_Automation.plugin_unloaded()
+        shutil.rmtree(work, ignore_errors=True)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=1)
+
+
+if __name__ == '__main__':
+    main()
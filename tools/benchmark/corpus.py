@@ -0,0 +1,214 @@
+#######################################################################################################################
+# HDL_Automation - Verilog and SystemVerilog automation with Sublime Text 4                                           #
+# Copyright (C) 2021  Dawid Szulc                                                                                     #
+#                                                                                                                     #
+# This program is free software: you can redistribute it and/or modify                                                #
+# it under the terms of the GNU General Public License as published by                                                #
+# the Free Software Foundation, either version 3 of the License, or                                                   #
+# (at your option) any later version.                                                                                 #
+#                                                                                                                     #
+# This program is distributed in the hope that it will be useful,                                                     #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of                                                      #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                                                       #
+# GNU General Public License for more details.                                                                        #
+#                                                                                                                     #
+# You should have received a copy of the GNU General Public License                                                   #
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.                                              #
+#######################################################################################################################
+
+'''Generate synthetic SystemVerilog files together with the output Verible would give for them
+
+Usage: python corpus.py LINES [--seed N] [--depth N] [--ports N] [--instances N] [--cursors N] [--output DIR]
+
+Each file is a chain of modules with wide port lists, instances of the next module of the chain and nested
+module declarations up to the requested depth. Lines are indented with tabs and every seventh line carries a
+stray space, so formatting changes a known part of the file. The syntax tree follows the shape of
+`verible-verilog-syntax --export_json`, it is also written as printed by `--printtree`, and the formatted output is indented with two spaces like
+`verible-verilog-format`.'''
+
+import argparse
+import json
+import os
+import random
+
+
+class Builder:
+    '''Write file content line by line and record syntax tree leaves at their byte offsets'''
+
+    def __init__(self):
+        '''Create empty file'''
+        self.text = []  # parts of file content
+        self.formatted = []  # parts of formatted file content
+        self.offset = 0  # byte offset of next character
+        self.lines = 0  # number of written lines
+        self.line = None  # code of current line, None before line is started
+        self.level = 0  # indentation of current line
+
+    def start(self, level):
+        '''Start new line indented by level'''
+        self.level = level
+        stray = ' ' if self.lines % 7 == 3 else ''  # misplace some lines so formatting has work to do
+        self.write('\t' * level + stray, '  ' * level)
+        self.line = ''
+
+    def end(self):
+        '''Finish current line'''
+        self.write('\n', '\n')
+        self.lines += 1
+        self.line = None
+
+    def write(self, text, formatted=None):
+        '''Append text to file content and formatted text to formatted content'''
+        self.text.append(text)
+        self.formatted.append(text if formatted is None else formatted)
+        self.offset += len(text.encode())
+
+    def leaf(self, tag, text, separator=' '):
+        '''Append token and return its syntax tree leaf'''
+        if self.line:  # if token is not the first of line
+            self.write(separator)
+        leaf = {'tag': tag, 'start': self.offset, 'end': self.offset + len(text.encode()), 'text': text}
+        self.write(text)
+        self.line = (self.line or '') + text
+        return leaf
+
+    def content(self):
+        '''Return file content and formatted file content'''
+        return ''.join(self.text), ''.join(self.formatted)
+
+
+def printtree(root):
+    '''Return syntax tree as printed by `verible-verilog-syntax --printtree`'''
+    lines = []
+    pending = [(root, 0, 0)]  # node, its position among siblings and indentation, last visited first
+    while pending:
+        item, position, depth = pending.pop()
+        if item is None:  # if node has to be closed
+            lines.append(' ' * depth + '}')
+        elif 'children' in item:  # if item is a node
+            lines.append(f"{' ' * depth}Node @{position} (tag: {item['tag']}) {{")
+            pending.append((None, 0, depth))
+            pending.extend((child, key, depth + 2) for key, child in reversed(list(enumerate(item['children']))))
+        else:  # if item is a leaf
+            tag = item['tag'] if item['tag'].startswith(('Symbol', 'TK_')) else json.dumps(item['tag'])
+            text = json.dumps(item['text'])
+            lines.append(f"{' ' * depth}Leaf @{position} (#{tag} @{item['start']}-{item['end']}: {text})")
+    return 'Parse Tree:\n' + '\n'.join(lines) + '\n'
+
+
+def node(tag, *children):
+    '''Return syntax tree node'''
+    return {'tag': tag, 'children': list(children)}
+
+
+def module(builder, name, level, depth, ports, instances, child, cursors):
+    '''Write module declaration with nested modules and return its syntax tree node'''
+    builder.start(level)
+    header = [builder.leaf('module', 'module'), builder.leaf('SymbolIdentifier', name), builder.leaf('(', '(')]
+    builder.end()
+    declarations = []  # port declarations
+    for port in range(ports):  # for each port
+        builder.start(level + 1)
+        direction = 'input' if port % 2 == 0 else 'output'
+        declaration = node(
+            'kPortDeclaration',
+            builder.leaf(direction, direction),
+            node('kDataType', builder.leaf('logic', 'logic'), node(
+                'kPackedDimensions',
+                builder.leaf('[', '['),
+                builder.leaf('TK_DecNumber', '7', ''),
+                builder.leaf(':', ':', ''),
+                builder.leaf('TK_DecNumber', '0', ''),
+                builder.leaf(']', ']', '')
+            )),
+            node('kUnqualifiedId', builder.leaf('SymbolIdentifier', f"p_{port}")),
+        )
+        declarations.append(declaration)
+        if port < ports - 1:  # if more ports follow
+            declarations.append(builder.leaf(',', ',', ''))
+        builder.end()
+    builder.start(level)
+    header += [node('kPortDeclarationList', *declarations), builder.leaf(')', ')'), builder.leaf(';', ';', '')]
+    builder.end()
+
+    items = []  # module items
+    for instance in range(instances if child else 0):  # for each instance of next module
+        builder.start(level + 1)
+        cursors.append(builder.offset)  # place cursor at start of instance
+        base = [node('kInstantiationType', node('kUnqualifiedId', builder.leaf('SymbolIdentifier', child)))]
+        gate = [builder.leaf('SymbolIdentifier', f"u_{instance}"), builder.leaf('(', '(')]
+        builder.end()
+        connections = []  # named port connections
+        for port in range(ports):  # for each port of instance
+            builder.start(level + 2)
+            connections.append(node(
+                'kActualNamedPort',
+                builder.leaf('.', '.'),
+                builder.leaf('SymbolIdentifier', f"p_{port}", ''),
+                builder.leaf('(', '(', ''),
+                node('kReference', builder.leaf('SymbolIdentifier', f"p_{port}", '')),
+                builder.leaf(')', ')', '')
+            ))
+            if port < ports - 1:  # if more ports follow
+                connections.append(builder.leaf(',', ',', ''))
+            builder.end()
+        builder.start(level + 1)
+        gate += [node('kPortActualList', *connections), builder.leaf(')', ')')]
+        base += [node('kGateInstanceRegisterVariableList', node('kGateInstance', *gate)), builder.leaf(';', ';', '')]
+        builder.end()
+        items.append(node('kInstantiationBase', *base))
+    if depth > 0:  # if nested modules are requested
+        items.append(module(builder, f"{name}_n", level + 1, depth - 1, max(1, ports // 2), instances, child, cursors))
+    builder.start(level)
+    footer = builder.leaf('endmodule', 'endmodule')
+    builder.end()
+    return node('kModuleDeclaration', node('kModuleHeader', *header), node('kModuleItemList', *items), footer)
+
+
+def generate(lines, seed=0, depth=4, ports=32, instances=4, cursors=64):
+    '''Return file content of about lines lines, its formatted content, syntax tree and cursor offsets'''
+    generator = random.Random(seed)  # make corpus reproducible
+    builder = Builder()
+    declarations = []  # top level module declarations
+    offsets = []  # starting offset of each instance
+    index = 0  # number of written modules
+    while builder.lines < lines:  # while file is too short
+        width = generator.randint(max(1, ports // 2), ports)  # vary port list width
+        declarations.append(module(builder, f"m_{index}", 0, depth, width, instances, f"m_{index + 1}", offsets))
+        index += 1
+    text, formatted = builder.content()
+    tree = {'-': {'tree': node('kDescriptionList', *declarations)}}
+    step = max(1, len(offsets) // cursors) if cursors else 0  # spread cursors over the file
+    content = text.encode()  # convert byte offsets of cursors to character offsets
+    cursors = [len(content[:offset].decode()) for offset in offsets[::step][:cursors]] if step else []
+    return text, formatted, tree, cursors
+
+
+def main():
+    '''Write generated file, its formatted content and syntax tree to output folder'''
+    parser = argparse.ArgumentParser(description='Generate synthetic SystemVerilog corpus')
+    parser.add_argument('lines', type=int, help='approximate number of lines')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--depth', type=int, default=4, help='depth of nested module declarations')
+    parser.add_argument('--ports', type=int, default=32, help='maximal number of ports of a module')
+    parser.add_argument('--instances', type=int, default=4, help='number of instances in each module')
+    parser.add_argument('--cursors', type=int, default=64, help='number of cursors to place')
+    parser.add_argument('--output', default='.', help='output folder')
+    args = parser.parse_args()
+    text, formatted, tree, cursors = generate(args.lines, args.seed, args.depth, args.ports, args.instances, args.cursors)
+    os.makedirs(args.output, exist_ok=True)
+    name = f"corpus_{args.lines}"
+    with open(os.path.join(args.output, f"{name}.sv"), 'w', encoding='utf-8', newline='') as file:
+        file.write(text)
+    with open(os.path.join(args.output, f"{name}.formatted.sv"), 'w', encoding='utf-8', newline='') as file:
+        file.write(formatted)
+    with open(os.path.join(args.output, f"{name}.json"), 'w', encoding='utf-8') as file:
+        json.dump(tree, file)
+    with open(os.path.join(args.output, f"{name}.tree"), 'w', encoding='utf-8', newline='') as file:
+        file.write(printtree(tree['-']['tree']))
+    with open(os.path.join(args.output, f"{name}.cursors.json"), 'w', encoding='utf-8') as file:
+        json.dump(cursors, file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#######################################################################################################################
+# HDL_Automation - Verilog and SystemVerilog automation with Sublime Text 4                                           #
+# Copyright (C) 2021  Dawid Szulc                                                                                     #
+#                                                                                                                     #
+# This program is free software: you can redistribute it and/or modify                                                #
+# it under the terms of the GNU General Public License as published by                                                #
+# the Free Software Foundation, either version 3 of the License, or                                                   #
+# (at your option) any later version.                                                                                 #
+#                                                                                                                     #
+# This program is distributed in the hope that it will be useful,                                                     #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of                                                      #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                                                       #
+# GNU General Public License for more details.                                                                        #
+#                                                                                                                     #
+# You should have received a copy of the GNU General Public License                                                   #
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.                                              #
+#######################################################################################################################
+
+'''Check the language server backend against the stand-in server
+
+Usage: python language_server_check.py
+
+Starts HDL_Automation_language_server with tools/verible_ls_stub.py and walks through didOpen, incremental
+didChange (including a change which arrives after a full resync and must not be applied twice), formatting,
+rangeFormatting, documentSymbol and shutdown. Each step is printed, the exit code is 1 when any step fails.'''
+
+import os
+import sys
+import time
+import types
+
+sys.path[:0] = [os.path.dirname(os.path.abspath(__file__)), os.path.join(os.path.dirname(__file__), '..', '..')]
+
+import mock_sublime
+
+mock_sublime.install()
+
+import HDL_Automation
+
+STUB = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'verible_ls_stub.py')
+TEXT = 'module top;\n\tsub u_a (.x(y));  \n\t\tsub u_b (.x(z));\nendmodule\n'
+
+failures = []
+
+
+def check(name, condition):
+    '''Print result of step and remember failure'''
+    print(f"{'ok  ' if condition else 'FAIL'} {name}")
+    if not condition:
+        failures.append(name)
+
+
+def expected(text, first=0, last=None):
+    '''Return text formatted by the stand-in server, lines first..last (0-based, exclusive end)'''
+    lines = text.split('\n')
+    for key in range(first, len(lines) if last is None else min(last, len(lines))):
+        line = lines[key].rstrip()
+        stripped = line.lstrip('\t')
+        lines[key] = '  ' * (len(line) - len(stripped)) + stripped
+    return '\n'.join(lines)
+
+
+def edit(view, begin, end, text):
+    '''Replace region of view and return the change with the fields of sublime.TextChange (ASCII text only)'''
+    def position(point):
+        row, col = view.rowcol(point)
+        return types.SimpleNamespace(pt=point, row=row, col=col, col_utf16=col, col_utf8=col)
+    change = types.SimpleNamespace(
+        a=position(begin), b=position(end), str=text, len_utf16=end - begin, len_utf8=end - begin
+    )
+    view.replace(None, mock_sublime.Region(begin, end), text)
+    return change
+
+
+def content(view):
+    '''Return current content of view'''
+    return view.substr(mock_sublime.Region(0, view.size()))
+
+
+def main():
+    view = mock_sublime.View(os.path.abspath('check.sv'), TEXT)
+    server = HDL_Automation.HDL_Automation_language_server((sys.executable, STUB))
+    job = HDL_Automation.HDL_Automation_job(view, 'Format')
+
+    server.sync(view, content(view))  # didOpen
+    check('didOpen and formatting', server.format(job, content(view), '') == expected(content(view)))
+
+    server.changed(view, [edit(view, 0, 0, '// header\n')], view.change_count())  # incremental didChange
+    check('incremental didChange', server.format(job, content(view), '') == expected(content(view)))
+
+    late = edit(view, view.size(), view.size(), '\t// tail  \n')  # change whose listener call is delayed
+    server.sync(view, content(view))  # full resync already contains the change
+    server.changed(view, [late], view.change_count())  # delayed listener call must be ignored
+    check('late change after resync', server.format(job, content(view), '') == expected(content(view)))
+
+    check('rangeFormatting', server.format(job, content(view), '3-3') == expected(content(view), 2, 3))
+
+    symbols = server.symbols(job)
+    names = [(symbol['name'], [child['name'] for child in symbol['children']]) for symbol in symbols or ()]
+    check('documentSymbol', names == [('top', ['u_a', 'u_b'])])
+
+    start = time.perf_counter()
+    server.shutdown()
+    check('shutdown does not block', time.perf_counter() - start < 0.5)
+    deadline = time.perf_counter() + 5
+    while server.alive() and time.perf_counter() < deadline:  # wait for server to exit
+        time.sleep(0.05)
+    check('server exits', not server.alive())
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,355 @@
+#######################################################################################################################
+# HDL_Automation - Verilog and SystemVerilog automation with Sublime Text 4                                           #
+# Copyright (C) 2021  Dawid Szulc                                                                                     #
+#                                                                                                                     #
+# This program is free software: you can redistribute it and/or modify                                                #
+# it under the terms of the GNU General Public License as published by                                                #
+# the Free Software Foundation, either version 3 of the License, or                                                   #
+# (at your option) any later version.                                                                                 #
+#                                                                                                                     #
+# This program is distributed in the hope that it will be useful,                                                     #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of                                                      #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                                                       #
+# GNU General Public License for more details.                                                                        #
+#                                                                                                                     #
+# You should have received a copy of the GNU General Public License                                                   #
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.                                              #
+#######################################################################################################################
+
+'''Minimal stand-ins for the `sublime` and `sublime_plugin` modules, enough to run HDL_Automation outside Sublime Text
+
+Call install() before importing HDL_Automation. Callbacks passed to set_timeout and set_timeout_async are queued
+and run by pump() on the calling thread, like the main thread of Sublime Text runs them. Views keep their content
+in a string and apply replacements lazily, so a burst of replacements costs a single copy of the content.'''
+
+import bisect
+import heapq
+import itertools
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import types
+
+
+class Region:
+    '''Range of characters between a and b'''
+
+    def __init__(self, a, b=None):
+        self.a = a
+        self.b = a if b is None else b
+
+    def begin(self):
+        return min(self.a, self.b)
+
+    def end(self):
+        return max(self.a, self.b)
+
+    def size(self):
+        return self.end() - self.begin()
+
+    def empty(self):
+        return self.a == self.b
+
+    def contains(self, point):
+        return self.begin() <= point <= self.end()
+
+    def __eq__(self, other):
+        return isinstance(other, Region) and (self.a, self.b) == (other.a, other.b)
+
+    def __repr__(self):
+        return f"Region({self.a}, {self.b})"
+
+
+class Settings:
+    '''Settings object backed by a dictionary'''
+
+    def __init__(self, values):
+        self.values = values
+        self.callbacks = {}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+        for callback in list(self.callbacks.values()):
+            callback()
+
+    def add_on_change(self, tag, callback):
+        self.callbacks[tag] = callback
+
+    def clear_on_change(self, tag):
+        self.callbacks.pop(tag, None)
+
+
+class QuickPanelItem:
+    '''Quick panel row'''
+
+    def __init__(self, trigger, details='', annotation='', kind=None):
+        self.trigger = trigger
+        self.details = details
+        self.annotation = annotation
+
+
+class Scheduler:
+    '''Queue of callbacks run on the thread calling pump()'''
+
+    def __init__(self):
+        self.queue = []  # due time, sequence number and callback
+        self.counter = itertools.count()  # keep callbacks with equal due time in order
+        self.condition = threading.Condition()
+
+    def put(self, callback, delay=0):
+        with self.condition:
+            heapq.heappush(self.queue, (time.perf_counter() + delay / 1000, next(self.counter), callback))
+            self.condition.notify()
+
+    def pump(self, until, timeout=60):
+        '''Run due callbacks until until() returns True'''
+        deadline = time.perf_counter() + timeout
+        while not until():
+            with self.condition:
+                now = time.perf_counter()
+                if now > deadline:
+                    raise TimeoutError('callbacks did not finish in time')
+                if self.queue and self.queue[0][0] <= now:
+                    callback = heapq.heappop(self.queue)[2]
+                else:  # wait for the next due or newly queued callback
+                    wait = self.queue[0][0] - now if self.queue else 0.01
+                    self.condition.wait(min(wait, 0.01))
+                    continue
+            callback()
+
+    def clear(self):
+        with self.condition:
+            self.queue.clear()
+
+
+class Selection(list):
+    '''Selections of a view'''
+
+    def clear(self):
+        del self[:]
+
+    def add(self, region):
+        self.append(region)
+
+
+class Window:
+    '''Window without project folders'''
+
+    def __init__(self):
+        self.window_id = next(ids)
+
+    def id(self):
+        return self.window_id
+
+    def folders(self):
+        return []
+
+    def views(self):
+        return []
+
+
+class View:
+    '''View of a file with its content held in memory'''
+
+    def __init__(self, file_name, text, window=None):
+        self.view_id = next(ids)
+        self.path = file_name
+        self.text = text
+        self.length = len(text)
+        self.edits = []  # replacements not applied to text yet, as start, end and new text
+        self.changes = 0
+        self.line_starts = None  # offset of each line, None when content has changed
+        self.selection = Selection([Region(0)])
+        self.popups = []
+        self.status = {}
+        self.regions = {}
+        self.parent = window or Window()
+
+    def id(self):
+        return self.view_id
+
+    def buffer_id(self):
+        return self.view_id
+
+    def file_name(self):
+        return self.path
+
+    def window(self):
+        return self.parent
+
+    def is_valid(self):
+        return True
+
+    def is_dirty(self):
+        return self.changes > 0
+
+    def change_count(self):
+        return self.changes
+
+    def encoding(self):
+        return 'UTF-8'
+
+    def line_endings(self):
+        return 'Unix'
+
+    def size(self):
+        return self.length
+
+    def content(self):
+        '''Return current content, applying pending replacements'''
+        if self.edits:
+            edits, self.edits = self.edits, []
+            parts = []
+            position = len(self.text)
+            ordered = all(edits[key][1] <= edits[key - 1][0] for key in range(1, len(edits)))
+            if ordered:  # if replacements go from the end of content without overlapping, copy content once
+                for start, end, text in edits:
+                    parts.append(self.text[end:position])
+                    parts.append(text)
+                    position = start
+                parts.append(self.text[:position])
+                self.text = ''.join(reversed(parts))
+            else:
+                for start, end, text in edits:
+                    self.text = self.text[:start] + text + self.text[end:]
+        return self.text
+
+    def substr(self, region):
+        if isinstance(region, int):
+            return self.content()[region:region + 1]
+        return self.content()[region.begin():region.end()]
+
+    def replace(self, edit, region, text):
+        self.edits.append((region.begin(), region.end(), text))
+        self.length += len(text) - region.size()
+        self.changes += 1
+        self.line_starts = None
+
+    def sel(self):
+        return self.selection
+
+    def lines(self):
+        if self.line_starts is None:
+            self.line_starts = [0] + [match.end() for match in re.finditer('\n', self.content())]
+        return self.line_starts
+
+    def rowcol(self, point):
+        row = bisect.bisect_right(self.lines(), point) - 1
+        return row, point - self.lines()[row]
+
+    def text_point(self, row, col):
+        lines = self.lines()
+        return lines[min(row, len(lines) - 1)] + col
+
+    def word(self, point):
+        content = self.content()
+        start = end = point
+        while start > 0 and (content[start - 1].isalnum() or content[start - 1] == '_'):
+            start -= 1
+        while end < len(content) and (content[end].isalnum() or content[end] == '_'):
+            end += 1
+        return Region(start, end)
+
+    def show_popup(self, content, flags=0, location=-1, max_width=320, max_height=240, on_navigate=None,
+                   on_hide=None):
+        self.popups.append(content)
+
+    def set_status(self, key, value):
+        self.status[key] = value
+
+    def erase_status(self, key):
+        self.status.pop(key, None)
+
+    def add_regions(self, key, regions, scope='', icon='', flags=0, annotations=(), annotation_color='',
+                    on_navigate=None, on_close=None):
+        self.regions[key] = (list(regions), list(annotations))
+
+    def erase_regions(self, key):
+        self.regions.pop(key, None)
+
+    def settings(self):
+        return Settings({})
+
+    def run_command(self, name, args=None):
+        command = commands[name](self)
+        command.run(None, **(args or {}))
+
+
+ids = itertools.count(1)
+scheduler = Scheduler()
+commands = {}  # text command class by command name
+messages = []  # status messages
+
+
+class TextCommand:
+    def __init__(self, view):
+        self.view = view
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        name = re.sub(r'(?<!^)(?=[A-Z])', '_', cls.__name__[:-len('Command')]).lower()
+        commands[name] = cls
+
+
+class WindowCommand:
+    def __init__(self, window):
+        self.window = window
+
+
+class EventListener:
+    pass
+
+
+class TextChangeListener:
+    pass
+
+
+def load_settings(name):
+    '''Return settings of package, initialized with the defaults shipped with HDL_Automation'''
+    if name not in settings:
+        path = os.path.join(os.path.dirname(__file__), '..', '..', name)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                text = re.sub(r'^\s*//.*$', '', file.read(), flags=re.M)  # remove comments
+            values = json.loads(text)
+        except (OSError, ValueError):
+            values = {}
+        settings[name] = Settings(values)
+    return settings[name]
+
+
+settings = {}  # settings objects by file name
+cache = tempfile.mkdtemp(prefix='HDL_Automation_benchmark_')
+
+
+def install():
+    '''Register stand-ins as the sublime and sublime_plugin modules'''
+    sublime = types.ModuleType('sublime')
+    sublime.Region = Region
+    sublime.QuickPanelItem = QuickPanelItem
+    sublime.ENCODED_POSITION = 1
+    sublime.DRAW_NO_FILL = 32
+    sublime.DRAW_NO_OUTLINE = 256
+    sublime.DRAW_SQUIGGLY_UNDERLINE = 2048
+    sublime.load_settings = load_settings
+    sublime.set_timeout = scheduler.put
+    sublime.set_timeout_async = scheduler.put
+    sublime.status_message = messages.append
+    sublime.cache_path = lambda: cache
+    sublime.platform = lambda: {'win32': 'windows', 'darwin': 'osx'}.get(sys.platform, 'linux')
+    sublime.version = lambda: '4000'
+    sublime_plugin = types.ModuleType('sublime_plugin')
+    sublime_plugin.TextCommand = TextCommand
+    sublime_plugin.WindowCommand = WindowCommand
+    sublime_plugin.EventListener = EventListener
+    sublime_plugin.TextChangeListener = TextChangeListener
+    sys.modules['sublime'] = sublime
+    sys.modules['sublime_plugin'] = sublime_plugin
+    return sublime, sublime_plugin
@@ -0,0 +1,158 @@
+#######################################################################################################################
+# HDL_Automation - Verilog and SystemVerilog automation with Sublime Text 4                                           #
+# Copyright (C) 2021  Dawid Szulc                                                                                     #
+#                                                                                                                     #
+# This program is free software: you can redistribute it and/or modify                                                #
+# it under the terms of the GNU General Public License as published by                                                #
+# the Free Software Foundation, either version 3 of the License, or                                                   #
+# (at your option) any later version.                                                                                 #
+#                                                                                                                     #
+# This program is distributed in the hope that it will be useful,                                                     #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of                                                      #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                                                       #
+# GNU General Public License for more details.                                                                        #
+#                                                                                                                     #
+# You should have received a copy of the GNU General Public License                                                   #
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.                                              #
+#######################################################################################################################
+
+'''Stand-in for verible-verilog-ls, so the language server backend can be exercised without Verible installed
+
+Usage: python verible_ls_stub.py [formatter flags are accepted and ignored]
+
+Supports initialize, shutdown, exit, didOpen, incremental and full didChange, didClose, formatting,
+rangeFormatting and documentSymbol. Formatting replaces leading tabs with two spaces and removes trailing
+whitespace. Document symbols report modules and the instances found inside them.
+
+benchmark/language_server_check.py runs the plugin's language server client against this stand-in.'''
+
+import json
+import re
+import sys
+
+
+documents = {}  # text of each opened document by URI
+
+
+def read():
+    '''Return next message from stdin or None when client has exited'''
+    length = None  # length of message body
+    while True:  # for each header line
+        line = sys.stdin.buffer.readline()
+        if not line:  # if client has exited
+            return None
+        line = line.strip()
+        if not line:  # if headers have ended
+            break
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':  # if header gives body length
+            length = int(value)
+    return json.loads(sys.stdin.buffer.read(length).decode('utf-8'))
+
+
+def write(message):
+    '''Write message to stdout'''
+    body = json.dumps(message).encode('utf-8')
+    sys.stdout.buffer.write(f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+    sys.stdout.buffer.flush()
+
+
+def offset(text, position):
+    '''Convert position to offset of text, characters are treated as UTF-16 code units'''
+    lines = text.split('\n')
+    line = min(position['line'], len(lines))
+    return sum(len(previous) + 1 for previous in lines[:line]) + position['character']
+
+
+def position(text, offset):
+    '''Convert offset of text to position'''
+    before = text[:offset]
+    return {'line': before.count('\n'), 'character': offset - before.rfind('\n') - 1}
+
+
+def format_lines(text, first, last):
+    '''Format lines first..last (0-based, exclusive end) of text'''
+    lines = text.split('\n')
+    for key in range(first, min(last, len(lines))):  # for each formatted line
+        line = lines[key].rstrip()  # remove trailing whitespace
+        stripped = line.lstrip('\t')  # remove leading tabs
+        lines[key] = '  ' * (len(line) - len(stripped)) + stripped  # indent with spaces
+    return '\n'.join(lines)
+
+
+def symbols(text):
+    '''Return modules and their instances as document symbols'''
+    result = []
+    for module in re.finditer(r'\bmodule\s+(\w+).*?\bendmodule\b', text, re.S):  # for each module
+        children = []
+        body_start = text.index(';', module.start()) + 1  # skip module header
+        for instance in re.finditer(r'^\s*(\w+)\s+(?:#\s*\(.*?\)\s*)?(\w+)\s*\(.*?\)\s*;', text[body_start:module.end()], re.M | re.S):
+            start = body_start + instance.start(1)
+            end = body_start + instance.end()
+            children.append({
+                'name': instance.group(2),
+                'detail': instance.group(1),
+                'kind': 13,
+                'range': {'start': position(text, start), 'end': position(text, end)},
+                'selectionRange': {'start': position(text, start), 'end': position(text, start)},
+            })
+        result.append({
+            'name': module.group(1),
+            'kind': 2,
+            'range': {'start': position(text, module.start()), 'end': position(text, module.end())},
+            'selectionRange': {'start': position(text, module.start(1)), 'end': position(text, module.end(1))},
+            'children': children,
+        })
+    return result
+
+
+def main():
+    '''Serve requests until exit notification'''
+    while True:
+        message = read()
+        if message is None:  # if client has exited
+            return
+        method = message.get('method')
+        params = message.get('params') or {}
+        result = None
+        if method == 'initialize':
+            result = {'capabilities': {
+                'textDocumentSync': 2,
+                'documentFormattingProvider': True,
+                'documentRangeFormattingProvider': True,
+                'documentSymbolProvider': True,
+            }}
+        elif method == 'exit':
+            return
+        elif method == 'textDocument/didOpen':
+            documents[params['textDocument']['uri']] = params['textDocument']['text']
+        elif method == 'textDocument/didChange':
+            uri = params['textDocument']['uri']
+            for change in params['contentChanges']:  # for each change in order
+                if 'range' in change:  # if change is incremental
+                    text = documents[uri]
+                    start = offset(text, change['range']['start'])
+                    end = offset(text, change['range']['end'])
+                    documents[uri] = text[:start] + change['text'] + text[end:]
+                else:  # if change replaces whole document
+                    documents[uri] = change['text']
+        elif method == 'textDocument/didClose':
+            documents.pop(params['textDocument']['uri'], None)
+        elif method in ['textDocument/formatting', 'textDocument/rangeFormatting']:
+            text = documents[params['textDocument']['uri']]
+            if method == 'textDocument/formatting':
+                formatted = format_lines(text, 0, text.count('\n') + 1)
+            else:
+                formatted = format_lines(text, params['range']['start']['line'], params['range']['end']['line'])
+            result = [{
+                'range': {'start': position(text, 0), 'end': position(text, len(text))},
+                'newText': formatted,
+            }]
+        elif method == 'textDocument/documentSymbol':
+            result = symbols(documents[params['textDocument']['uri']])
+        if 'id' in message and method is not None:  # if client waits for response
+            write({'jsonrpc': '2.0', 'id': message['id'], 'result': result})
+
+
+if __name__ == '__main__':
+    main()